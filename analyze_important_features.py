@@ -1,65 +1,177 @@
-import pandas as pd
+"""
+Feature importance analysis for churn prediction.
+
+Ranks every data.csv column by permutation importance (ROC-AUC drop when
+the column is shuffled in the held-out split) and drop-column importance
+(ROC-AUC drop when the forest is retrained without it), alongside the
+forest's impurity importance. Both are computed per feature on a process
+pool; workers memory-map one cached encoded matrix.
+
+Usage:
+    python analyze_important_features.py                          # all rows, top 5
+    python analyze_important_features.py --sample 20000 --top-k 8
+    python analyze_important_features.py --output top_features.json
+    python training_pipeline.py --config top_features.json        # train on the chosen features
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-import matplotlib.pyplot as plt
-
-# Load data
-df = pd.read_csv('data.csv')
-
-# Drop customerID
-df = df.drop('customerID', axis=1)
-
-# Handle TotalCharges (convert to numeric)
-df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
-df['TotalCharges'].fillna(df['TotalCharges'].median(), inplace=True)
-
-# Encode target
-df['Churn'] = df['Churn'].map({'Yes': 1, 'No': 0})
-
-# Encode categorical variables
-label_encoders = {}
-categorical_cols = df.select_dtypes(include=['object']).columns
-
-for col in categorical_cols:
-    le = LabelEncoder()
-    df[col] = le.fit_transform(df[col].astype(str))
-    label_encoders[col] = le
-
-# Separate features and target
-X = df.drop('Churn', axis=1)
-y = df['Churn']
-
-# Train Random Forest to get feature importance
-rf = RandomForestClassifier(n_estimators=100, random_state=42)
-rf.fit(X, y)
-
-# Get feature importance
-feature_importance = pd.DataFrame({
-    'feature': X.columns,
-    'importance': rf.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("\n" + "="*60)
-print("TOP 10 MOST IMPORTANT FEATURES FOR CHURN PREDICTION")
-print("="*60)
-print(feature_importance.head(10).to_string(index=False))
-print("="*60)
-
-# Calculate correlation with Churn
-correlations = df.corr()['Churn'].abs().sort_values(ascending=False)
-print("\n" + "="*60)
-print("TOP 10 FEATURES BY CORRELATION WITH CHURN")
-print("="*60)
-print(correlations.head(11).to_string())  # 11 because Churn itself is included
-print("="*60)
-
-# Recommend top 5 features
-print("\n" + "="*60)
-print("RECOMMENDED TOP 5 FEATURES FOR PREDICTION:")
-print("="*60)
-top_5 = feature_importance.head(5)['feature'].tolist()
-for i, feature in enumerate(top_5, 1):
-    importance = feature_importance[feature_importance['feature'] == feature]['importance'].values[0]
-    print(f"{i}. {feature} (importance: {importance:.4f})")
-print("="*60)
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from training_pipeline import (FEATURES, PRESETS, TrainingConfig, load_dataset, preset_config,
+                               split_dataset)
+
+ID_COLUMN = 'customerID'
+
+_worker = {}
+
+
+def all_features(config: TrainingConfig) -> list:
+    """Every column of the data file except the id and the target"""
+    columns = pd.read_csv(config.data_path, nrows=0).columns
+    return [c for c in columns if c not in (ID_COLUMN, config.target)]
+
+
+def _init_worker(data_dir: str):
+    for name in ('X_train', 'y_train', 'X_test', 'y_test'):
+        _worker[name] = np.load(os.path.join(data_dir, f'{name}.npy'), mmap_mode='r')
+    with open(os.path.join(data_dir, 'model.pkl'), 'rb') as f:
+        _worker['model'] = pickle.load(f)
+
+
+def permutation_task(task: tuple) -> np.ndarray:
+    """ROC-AUC drops from shuffling one column, once per repeat"""
+    column, n_repeats, baseline, seed = task
+    X = np.array(_worker['X_test'])
+    y = _worker['y_test']
+    rng = np.random.default_rng(seed + column)
+    original = X[:, column].copy()
+    drops = []
+    for _ in range(n_repeats):
+        X[:, column] = rng.permutation(original)
+        drops.append(baseline - roc_auc_score(y, _worker['model'].predict_proba(X)[:, 1]))
+    return np.array(drops)
+
+
+def drop_column_task(task: tuple) -> float:
+    """ROC-AUC drop from retraining without one column"""
+    column, model_params, baseline, seed = task
+    keep = [i for i in range(_worker['X_train'].shape[1]) if i != column]
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **model_params)
+    model.fit(_worker['X_train'][:, keep], _worker['y_train'])
+    proba = model.predict_proba(_worker['X_test'][:, keep])[:, 1]
+    return baseline - roc_auc_score(_worker['y_test'], proba)
+
+
+def analyze(config: TrainingConfig, sample: int = None, n_repeats: int = 5, n_workers: int = None,
+            drop_column: bool = True) -> pd.DataFrame:
+    """Importance table, one row per feature, sorted by permutation importance"""
+    dataset = load_dataset(config)
+    X, y = dataset.X, dataset.y
+    if sample and sample < len(y):
+        X, _, y, _ = train_test_split(X, y, train_size=sample, random_state=config.random_state, stratify=y)
+        dataset = type(dataset)(X, y, dataset.feature_names, dataset.encoders)
+    X_train, X_test, y_train, y_test = split_dataset(dataset, config)
+
+    model = RandomForestClassifier(random_state=config.random_state, n_jobs=config.n_jobs, **config.model_params)
+    model.fit(X_train, y_train)
+    model.set_params(n_jobs=1)
+    baseline = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    print(f"   Baseline ROC-AUC on {len(y_test)} held-out rows: {baseline:.4f}")
+
+    # Shared with the workers through the page cache instead of pickling per task
+    data_dir = os.path.join(config.cache_dir, 'importance')
+    os.makedirs(data_dir, exist_ok=True)
+    for name, array in (('X_train', X_train), ('y_train', y_train), ('X_test', X_test), ('y_test', y_test)):
+        np.save(os.path.join(data_dir, f'{name}.npy'), array)
+    with open(os.path.join(data_dir, 'model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+
+    columns = range(len(dataset.feature_names))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+        permutation = list(pool.map(permutation_task,
+                                    [(c, n_repeats, baseline, config.random_state) for c in columns]))
+        drop = list(pool.map(drop_column_task,
+                             [(c, config.model_params, baseline, config.random_state) for c in columns])) \
+            if drop_column else [np.nan] * len(columns)
+
+    return pd.DataFrame({
+        'feature': dataset.feature_names,
+        'permutation': [d.mean() for d in permutation],
+        'permutation_std': [d.std() for d in permutation],
+        'drop_column': drop,
+        'impurity': model.feature_importances_,
+    }).sort_values('permutation', ascending=False).reset_index(drop=True)
+
+
+def feature_set_config(top: list) -> dict:
+    """
+    training_pipeline.py --config overrides for a feature set. The API's
+    five features are written in the API's order and train the served
+    model; any other set trains into its own directory, given relative to
+    the repository root.
+    """
+    if sorted(top) == sorted(FEATURES):
+        return {'features': list(FEATURES)}
+    suffix = f'top{len(top)}'
+    return {
+        'features': top,
+        'model_suffix': suffix,
+        'output_dir': os.path.join('.cache', 'models', suffix),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Permutation and drop-column feature importance")
+    parser.add_argument('--preset', default='balanced', choices=list(PRESETS),
+                        help="config supplying data path, cleaning and forest parameters")
+    parser.add_argument('--sample', type=int, help="analyze a stratified sample of this many rows")
+    parser.add_argument('--repeats', type=int, default=5, help="permutation repeats per feature")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--no-drop-column', action='store_true', help="skip the retraining-based importance")
+    parser.add_argument('--rank-by', default='permutation', choices=['permutation', 'drop_column', 'impurity'])
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--output', help="write the top-k features as a training_pipeline.py --config JSON "
+                                         "(API feature set: served model; otherwise its own output directory)")
+    args = parser.parse_args(argv)
+
+    config = preset_config(args.preset)
+    config = TrainingConfig.from_dict({'features': all_features(config)}, base=config)
+
+    print("=" * 72)
+    print(f"FEATURE IMPORTANCE ({len(config.features)} features)")
+    print("=" * 72)
+    start = time.perf_counter()
+    table = analyze(config, sample=args.sample, n_repeats=args.repeats, n_workers=args.workers,
+                    drop_column=not args.no_drop_column)
+    table = table.sort_values(args.rank_by, ascending=False).reset_index(drop=True)
+    table.index += 1
+    print(table.round(4).to_string())
+    print(f"\nAnalysis finished in {time.perf_counter() - start:.1f}s")
+
+    top = table['feature'].head(args.top_k).tolist()
+    print("\n" + "=" * 72)
+    print(f"RECOMMENDED TOP {args.top_k} FEATURES (by {args.rank_by}):")
+    print("=" * 72)
+    for i, row in table.head(args.top_k).iterrows():
+        print(f"{i}. {row['feature']} ({args.rank_by}: {row[args.rank_by]:.4f})")
+
+    if args.output:
+        overrides = feature_set_config(top)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(overrides, f, indent=2)
+        print(f"\nFeature set written to {args.output}")
+        if 'output_dir' in overrides:
+            print(f"   Not the API's feature set; training it writes to {overrides['output_dir']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,39 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from routes import employees, predict, chatbot
+from utils.employee_store import employee_store
 
-app = FastAPI(title="Employee Insight Portal API")
+logger = logging.getLogger(__name__)
+
+# Startup steps; the service is healthy only once the required ones succeed
+WARMUP_STEPS = {
+    "model": (predict.warm_up_model, True),
+    "employees": (employee_store.get, True),
+    "embeddings": (chatbot.warm_up_embeddings, False),
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and validate everything before serving, instead of on first request
+    app.state.ready = False
+    app.state.components = {}
+    chatbot.start_embedding_executor()
+    for name, (step, _) in WARMUP_STEPS.items():
+        try:
+            await run_in_threadpool(step)
+            app.state.components[name] = "ok"
+        except Exception as e:
+            logger.exception("Warm-up step %r failed", name)
+            app.state.components[name] = f"error: {e}"
+    app.state.ready = True
+    yield
+    chatbot.stop_embedding_executor()
+
+app = FastAPI(title="Employee Insight Portal API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -25,12 +56,31 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "employees": "/employees",
+            "employee_stats": "/employees/stats",
             "employee_detail": "/employee/{id}",
             "predict": "/predict",
-            "chat": "/chat"
+            "predict_batch": "/predict/batch",
+            "predict_file": "/predict/file",
+            "chat": "/chat",
+            "chat_stream": "/chat/stream",
+            "chat_cache_stats": "/chat/cache/stats"
         }
     }
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    """
+    Readiness probe: 503 until startup warm-up has finished, or if a
+    required component (model, employee data) failed to load.
+    """
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    
+    components = app.state.components
+    failed = [name for name, (_, required) in WARMUP_STEPS.items()
+              if required and components.get(name) != "ok"]
+    if failed:
+        return JSONResponse(status_code=503, content={"status": "unhealthy", "components": components})
+    
+    degraded = any(status != "ok" for status in components.values())
+    return {"status": "degraded" if degraded else "healthy", "components": components}
@@ -0,0 +1,65 @@
+"""
+Benchmark: employee_id hash index vs boolean-mask scan for GET /employee/{id}
+
+Run from the backend directory:
+    python benchmarks/bench_employee_lookup.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.employee_store import EmployeeSnapshot
+
+SIZES = [7_000, 70_000, 700_000, 7_000_000]
+LOOKUPS = 200
+
+
+def make_employees(n: int) -> pd.DataFrame:
+    """Synthetic employee frame shaped like data/employees.csv"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in range(1, n + 1)],
+        'department': rng.choice(['Sales', 'Engineering', 'HR', 'Marketing', 'Operations'], n),
+        'churn_probability': rng.random(n).round(2),
+    })
+
+
+def time_per_lookup(fn, ids) -> float:
+    start = time.perf_counter()
+    for employee_id in ids:
+        fn(employee_id)
+    return (time.perf_counter() - start) / len(ids)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+
+    print("=" * 60)
+    print("EMPLOYEE LOOKUP: HASH INDEX vs MASK SCAN")
+    print("=" * 60)
+    print(f"{'rows':>10} {'mask scan':>14} {'hash index':>14} {'speedup':>10}")
+
+    for n in sizes:
+        df = make_employees(n)
+        snapshot = EmployeeSnapshot(df, mtime=0.0)
+        ids = np.random.default_rng(0).choice(df['employee_id'].to_numpy(), LOOKUPS)
+
+        def mask_scan(employee_id):
+            return df[df['employee_id'] == employee_id].iloc[0].to_dict()
+
+        def hash_lookup(employee_id):
+            return df.iloc[snapshot.find(employee_id)].to_dict()
+
+        mask_t = time_per_lookup(mask_scan, ids[:20] if n > 1_000_000 else ids)
+        hash_t = time_per_lookup(hash_lookup, ids)
+        print(f"{n:>10,} {mask_t * 1e6:>11.1f} us {hash_t * 1e6:>11.1f} us {mask_t / hash_t:>9.1f}x")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: compiled flat-array forest vs scikit-learn predict_proba
+
+Reports p50/p99 latency for single-row and batch scoring with the trained
+model in models/, and checks that both give identical probabilities.
+
+Run from the backend directory:
+    python benchmarks/bench_forest_engine.py
+"""
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.forest_engine import compile_forest
+
+MODEL_PATH = "./models/churn_model_5features.pkl"
+BATCH_SIZES = [1, 100, 1_000, 10_000]
+REPEATS = {1: 500, 100: 200, 1_000: 50, 10_000: 20}
+
+
+def latency_percentiles(fn, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def main():
+    with open(MODEL_PATH, 'rb') as f:
+        forest = pickle.load(f)
+
+    start = time.perf_counter()
+    # Measure the array engine itself, without the large-batch fallback
+    compiled = compile_forest(forest, keep_fallback=False)
+    compile_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(42)
+    n_features = forest.n_features_in_
+
+    print("=" * 72)
+    print("FOREST INFERENCE: COMPILED ARRAYS vs SCIKIT-LEARN")
+    print("=" * 72)
+    print(f"Trees: {compiled.n_estimators}, nodes: {compiled.n_nodes}, "
+          f"max depth: {compiled.max_depth}, compile time: {compile_time * 1e3:.1f} ms")
+
+    X_check = rng.normal(size=(10_000, n_features))
+    identical = np.array_equal(forest.predict_proba(X_check), compiled.predict_proba(X_check))
+    print(f"Identical probabilities on 10,000 rows: {identical}")
+
+    print(f"\n{'rows':>8} {'sklearn p50':>12} {'sklearn p99':>12} {'compiled p50':>13} {'compiled p99':>13} {'speedup':>8}")
+    for n in BATCH_SIZES:
+        X = rng.normal(size=(n, n_features))
+        sk_p50, sk_p99 = latency_percentiles(forest.predict_proba, X, REPEATS[n])
+        cf_p50, cf_p99 = latency_percentiles(compiled.predict_proba, X, REPEATS[n])
+        print(f"{n:>8,} {sk_p50 * 1e3:>9.3f} ms {sk_p99 * 1e3:>9.3f} ms "
+              f"{cf_p50 * 1e3:>10.3f} ms {cf_p99 * 1e3:>10.3f} ms {sk_p50 / cf_p50:>7.1f}x")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
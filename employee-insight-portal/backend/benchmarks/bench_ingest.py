@@ -0,0 +1,124 @@
+"""
+Benchmark: default pd.read_csv vs typed chunked read vs memory-mapped
+columnar cache, on a synthetic telecom export shaped like data.csv
+
+The export is data.csv tiled to the requested row count. Each method runs
+in a fresh process and reports wall time, peak RSS above an idle
+interpreter, and the size of the resulting DataFrame. Every method ends
+with the same small scan (churn rate per contract) so the loaded data is
+actually touched.
+
+Run from the backend directory:
+    python benchmarks/bench_ingest.py                      # 10M rows
+    python benchmarks/bench_ingest.py --rows 1000000 --workdir /tmp/ingest
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.ingest import build_column_cache, cacheable_columns, load_frame, read_typed_csv
+
+DATA_CSV = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data.csv')
+
+
+def make_export(path: str, n_rows: int):
+    """Write data.csv repeated until n_rows rows"""
+    base = pd.read_csv(DATA_CSV, dtype=str, keep_default_na=False)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < n_rows:
+            block = base.iloc[:n_rows - written]
+            block.to_csv(f, index=False, header=written == 0)
+            written += len(block)
+
+
+def load_default(path, cache_dir):
+    """What the scripts used to do"""
+    df = pd.read_csv(path)
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    return df
+
+
+def load_typed(path, cache_dir):
+    return read_typed_csv(path)
+
+
+def load_cached(path, cache_dir):
+    return load_frame(path, cacheable_columns(), cache_dir=cache_dir)
+
+
+METHODS = {
+    'pd.read_csv defaults': load_default,
+    'typed, chunked': load_typed,
+    'columnar cache (mmap)': load_cached,
+}
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(name, path, cache_dir, queue):
+    idle = peak_rss_mb()
+    start = time.perf_counter()
+    df = METHODS[name](path, cache_dir)
+    load_time = time.perf_counter() - start
+    (df['Churn'] == 'Yes').groupby(df['Contract'], observed=True).mean()
+    total_time = time.perf_counter() - start
+    frame_mb = df.memory_usage(deep=True).sum() / 2 ** 20
+    queue.put((load_time, total_time, peak_rss_mb() - idle, frame_mb))
+
+
+def run(name, path, cache_dir):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(name, path, cache_dir, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workdir', help="where to write the export and cache (default: a temporary directory)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_ingest_')
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f'export_{args.rows}.csv')
+    cache_dir = os.path.join(workdir, 'cache')
+    try:
+        if not os.path.exists(path):
+            make_export(path, args.rows)
+
+        start = time.perf_counter()
+        build_column_cache(path, cache_dir)
+        build_time = time.perf_counter() - start
+
+        print("=" * 80)
+        print(f"INGESTION: {args.rows:,} rows, {os.path.getsize(path) / 2 ** 20:,.0f} MB CSV")
+        print("=" * 80)
+        print(f"{'method':<24} {'load':>9} {'load+scan':>10} {'peak RSS':>11} {'frame':>11}")
+        for name in METHODS:
+            load_time, total_time, rss, frame = run(name, path, cache_dir)
+            print(f"{name:<24} {load_time:>8.2f}s {total_time:>9.2f}s {rss:>8,.0f} MB {frame:>8,.0f} MB")
+        print(f"\nOne-time cache build (streamed): {build_time:.2f}s")
+        print("Cached frames are read-only mmap views; their pages live in the OS page cache.")
+        print("=" * 80)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
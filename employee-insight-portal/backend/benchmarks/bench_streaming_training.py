@@ -0,0 +1,90 @@
+"""
+Benchmark: in-memory training vs streaming (chunked, warm-started forest)
+training, on a synthetic export shaped like data.csv
+
+The export is data.csv tiled to the requested row count and its columnar
+cache is built up front, so both paths start from the same mmap-able
+columns. Each path runs the 'balanced' preset in a fresh process and
+reports wall time, peak RSS above an idle interpreter, and accuracy and
+ROC-AUC on its own 20% hold-out. Tiling repeats customers, so both scores
+are optimistic; compare them with each other, not with the 7k-row model.
+
+Run from the backend directory:
+    python benchmarks/bench_streaming_training.py
+    python benchmarks/bench_streaming_training.py --rows 5000000 --chunk-rows 500000 --workdir /tmp/stream
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from bench_ingest import make_export
+from utils.ingest import build_column_cache
+
+
+def measure(streaming, path, workdir, chunk_rows, queue):
+    from training_pipeline import TrainingConfig, preset_config, run
+
+    config = TrainingConfig.from_dict({
+        'data_path': path,
+        'cache_dir': os.path.join(workdir, 'cache'),
+        'output_dir': os.path.join(workdir, 'streaming' if streaming else 'in_memory'),
+        'streaming': streaming,
+        'chunk_rows': chunk_rows,
+    }, base=preset_config('balanced'))
+    idle = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        metrics = run(config)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - idle
+    queue.put((elapsed, peak, metrics['accuracy'], metrics['roc_auc']))
+
+
+def run_isolated(streaming, path, workdir, chunk_rows):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(streaming, path, workdir, chunk_rows, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-rows', type=int, default=250_000)
+    parser.add_argument('--workdir', help="where to write the export, cache and models (default: a temporary directory)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_streaming_')
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f'export_{args.rows}.csv')
+    try:
+        if not os.path.exists(path):
+            make_export(path, args.rows)
+        build_column_cache(path, os.path.join(workdir, 'cache'))
+
+        print("=" * 72)
+        print(f"TRAINING: {args.rows:,} rows, streaming chunks of {args.chunk_rows:,}")
+        print("=" * 72)
+        print(f"{'path':<12} {'time':>9} {'peak RSS':>11} {'accuracy':>10} {'ROC-AUC':>9}")
+        for name, streaming in (('in-memory', False), ('streaming', True)):
+            elapsed, peak, accuracy, roc_auc = run_isolated(streaming, path, workdir, args.chunk_rows)
+            print(f"{name:<12} {elapsed:>8.1f}s {peak:>8,.0f} MB {accuracy:>10.4f} {roc_auc:>9.4f}")
+        print("=" * 72)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
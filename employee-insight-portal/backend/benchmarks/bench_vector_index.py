@@ -0,0 +1,94 @@
+"""
+Benchmark: brute-force vs IVF retrieval index at 10k / 100k / 1M chunks
+
+Uses clustered synthetic unit vectors (real sentence embeddings are
+clustered by topic too). Reports build time, p50/p99 query latency and
+recall@k of IVF against the exact brute-force results.
+
+Run from the backend directory:
+    python benchmarks/bench_vector_index.py                # 10k, 100k, 1M at dim 384
+    python benchmarks/bench_vector_index.py --dim 128 --sizes 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.vector_index import BruteForceIndex, IVFIndex
+
+QUERIES = 200
+TOP_K = 3
+
+
+def make_vectors(n: int, dim: int, rng, n_topics: int = 1000) -> np.ndarray:
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    # Fill in blocks to keep peak memory near the final matrix size
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        vectors[start:end] = topics[rng.integers(0, n_topics, end - start)]
+        vectors[start:end] += 0.6 * rng.normal(size=(end - start, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build(index, vectors, batch: int = 100_000) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch):
+        chunk = vectors[offset:offset + batch]
+        index.add(range(offset, offset + len(chunk)), chunk)
+    return time.perf_counter() - start
+
+
+def query_latencies(index, queries):
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        ids, _ = index.search(query, TOP_K)
+        timings.append(time.perf_counter() - start)
+        results.append(set(ids.tolist()))
+    return np.percentile(timings, 50), np.percentile(timings, 99), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--dim', type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print("=" * 84)
+    print(f"VECTOR INDEX: BRUTE FORCE vs IVF (dim={args.dim}, top-{TOP_K}, {QUERIES} queries)")
+    print("=" * 84)
+    print(f"{'chunks':>10} {'index':>22} {'build':>9} {'p50':>10} {'p99':>10} {'recall@k':>9}")
+
+    for n in args.sizes:
+        vectors = make_vectors(n, args.dim, rng)
+        queries = vectors[rng.choice(n, QUERIES, replace=False)] + 0.1 * rng.normal(size=(QUERIES, args.dim)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact = BruteForceIndex()
+        build_time = build(exact, vectors)
+        p50, p99, truth = query_latencies(exact, queries)
+        print(f"{n:>10,} {'bruteforce':>22} {build_time:>8.2f}s {p50 * 1e3:>7.2f} ms {p99 * 1e3:>7.2f} ms {1.0:>9.3f}")
+
+        n_lists = max(16, int(4 * np.sqrt(n)))
+        for n_probe in (4, 16):
+            ivf = IVFIndex(n_lists=n_lists, n_probe=n_probe, train_size=min(n, 64 * n_lists))
+            build_time = build(ivf, vectors)
+            p50, p99, found = query_latencies(ivf, queries)
+            recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+            label = f"ivf {n_lists} lists/{n_probe} probe"
+            print(f"{n:>10,} {label:>22} {build_time:>8.2f}s {p50 * 1e3:>7.2f} ms {p99 * 1e3:>7.2f} ms {recall:>9.3f}")
+
+        del vectors, exact, ivf
+
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Retrieval quality: legacy paragraph split vs token-budget chunker, and
+dense vs BM25 vs hybrid ranking
+
+Each question is labelled with a phrase the answer must contain. For each
+configuration this reports hit rate@k (a retrieved chunk contains the
+phrase), MRR, and the prompt context size after packing, using the same
+embedding model as the chatbot.
+
+Run from the backend directory:
+    python benchmarks/eval_retrieval.py
+    python benchmarks/eval_retrieval.py --chunk-tokens 80 --overlap 16 --budget 300
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from sentence_transformers import SentenceTransformer
+from utils.bm25 import BM25Index, reciprocal_rank_fusion
+from utils.chunking import chunk_text, count_tokens, pack_context
+from utils.knowledge_base import KNOWLEDGE_FILES
+
+# (question, phrase the retrieved context must contain)
+QUESTIONS = [
+    ("Which department has the highest churn?", "Sales: 28% annual churn rate"),
+    ("How does tenure affect churn?", "0-6 months: 35% churn"),
+    ("What is the strongest predictor of churn?", "strongest predictor"),
+    ("Why do top performers leave?", "recruited by competitors"),
+    ("What workload leads to burnout?", "burnout risk"),
+    ("Does promotion reduce churn?", "Promoted in last 5 years"),
+    ("How much does it cost when an employee leaves?", "Recruitment costs"),
+    ("When is an employee eligible for promotion?", "Minimum 18 months in current role"),
+    ("How are employees evaluated?", "evaluated quarterly"),
+    ("What is the learning budget for engineers?", "Continuous learning budget"),
+    ("What are the retention red flags?", "Declining performance scores"),
+    ("What interventions are used for at-risk employees?", "One-on-one meetings"),
+    ("Why do people quit according to exit interviews?", "Limited career growth opportunities"),
+    ("How many projects is optimal?", "3-4 projects"),
+    ("What benefits help retain talent?", "Competitive compensation packages"),
+]
+
+
+def legacy_split(content: str, source: str) -> list:
+    """The original splitter: paragraphs on blank lines, > 50 characters"""
+    return [{'content': s.strip(), 'source': source}
+            for s in content.split('\n\n') if len(s.strip()) > 50]
+
+
+def rank_documents(mode, question, query, doc_embeddings, bm25, top_k):
+    dense = [int(i) for i in np.argsort(-(doc_embeddings @ query))[:2 * top_k]]
+    lexical = bm25.search(question, 2 * top_k)[0].tolist()
+    if mode == 'dense':
+        return dense[:top_k]
+    if mode == 'bm25':
+        return lexical[:top_k]
+    fused = reciprocal_rank_fusion([dense, lexical])
+    return sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+
+def evaluate(name, documents, model, top_k, budget, mode='dense'):
+    doc_embeddings = model.encode([d['content'] for d in documents], normalize_embeddings=True)
+    query_embeddings = model.encode([q for q, _ in QUESTIONS], normalize_embeddings=True)
+    bm25 = BM25Index([d['content'] for d in documents])
+
+    hits, reciprocal_ranks, context_tokens = 0, [], []
+    for (question, phrase), query in zip(QUESTIONS, query_embeddings):
+        order = rank_documents(mode, question, query, doc_embeddings, bm25, top_k)
+        retrieved = [documents[i] for i in order]
+        packed = pack_context(retrieved, budget) if budget else retrieved
+
+        rank = next((r for r, d in enumerate(packed, 1) if phrase in d['content']), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        context_tokens.append(sum(count_tokens(d['content']) for d in packed))
+
+    sizes = [count_tokens(d['content']) for d in documents]
+    print(f"{name:<26} {len(documents):>7} {np.mean(sizes):>8.0f} {max(sizes):>6} "
+          f"{hits / len(QUESTIONS):>8.2f} {np.mean(reciprocal_ranks):>6.2f} {np.mean(context_tokens):>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chunk-tokens', type=int, default=120)
+    parser.add_argument('--overlap', type=int, default=20)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--budget', type=int, default=400, help="context token budget")
+    args = parser.parse_args()
+
+    texts = []
+    for path, source in KNOWLEDGE_FILES:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.append((f.read(), source))
+
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+
+    print("=" * 84)
+    print(f"RETRIEVAL QUALITY ({len(QUESTIONS)} questions, top-{args.top_k}, context budget {args.budget} tokens)")
+    print("=" * 84)
+    print(f"{'configuration':<26} {'chunks':>7} {'avg tok':>8} {'max':>6} {'hit@k':>8} {'MRR':>6} {'ctx tokens':>10}")
+
+    legacy = [d for content, source in texts for d in legacy_split(content, source)]
+    # The original /chat: top-3 paragraphs, no budget
+    evaluate("paragraphs, top-3", legacy, model, 3, budget=None)
+    evaluate("paragraphs + budget", legacy, model, args.top_k, args.budget)
+
+    chunks = [d for content, source in texts
+              for d in chunk_text(content, source, args.chunk_tokens, args.overlap)]
+    for mode in ('dense', 'bm25', 'hybrid'):
+        evaluate(f"chunker {args.chunk_tokens}/{args.overlap} {mode}", chunks, model, args.top_k, args.budget, mode)
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
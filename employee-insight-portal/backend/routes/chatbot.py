@@ -1,12 +1,23 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import google.generativeai as genai
-import pandas as pd
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.bm25 import BM25Index, linear_fusion, reciprocal_rank_fusion
+from utils.chunking import pack_context
+from utils.embedding_index import EmbeddingIndex
+from utils.employee_store import employee_store
+from utils.knowledge_base import KnowledgeBase, build_employee_record, knowledge_base_cache
+from utils.llm_client import make_llm_client
+from utils.response_cache import SemanticResponseCache
+from utils.vector_index import make_index
 
 load_dotenv()
 
@@ -15,196 +26,346 @@ router = APIRouter()
 class ChatRequest(BaseModel):
     message: str
 
-# Configure Gemini
+# Configure Gemini (or LLM_BACKEND=stub for offline use)
 api_key = os.getenv("OPENAI_API_KEY")  # Using same env var
-if api_key:
-    genai.configure(api_key=api_key)
+llm_client = make_llm_client(api_key=api_key)
+
+# At most this many chats wait on the LLM at once; the rest queue here
+# instead of piling up requests against the API
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+chat_semaphore = asyncio.Semaphore(CHAT_MAX_CONCURRENCY)
+
+# Embedding and retrieval are CPU-bound; keep them off the shared
+# threadpool that serves /predict and /employees. Created per app
+# lifespan; None (no lifespan running) falls back to the default pool
+embedding_executor = None
+
+def start_embedding_executor():
+    """Create the embedding threadpool for one app lifespan"""
+    global embedding_executor
+    embedding_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="embedding")
+
+def stop_embedding_executor():
+    """Shut down the embedding threadpool; a later lifespan starts a new one"""
+    global embedding_executor
+    executor, embedding_executor = embedding_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+# Answers to near-duplicate questions are served locally until the
+# knowledge base changes
+response_cache = SemanticResponseCache(
+    max_entries=int(os.getenv("CHAT_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600")),
+    threshold=float(os.getenv("CHAT_CACHE_THRESHOLD", "0.95")),
+)
 
 # Load embedding model (cached)
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
 embedding_model = None
+_embedding_model_lock = threading.Lock()
 
 def get_embedding_model():
     global embedding_model
     if embedding_model is None:
-        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        with _embedding_model_lock:
+            if embedding_model is None:
+                embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
     return embedding_model
 
+# Knowledge-base embeddings persisted on disk, keyed by content hash
+embedding_index = EmbeddingIndex(model_name=EMBEDDING_MODEL_NAME)
+
+def encode_texts(texts: list) -> np.ndarray:
+    """Unit-length embeddings for a list of texts"""
+    return get_embedding_model().encode(texts, normalize_embeddings=True)
+
+# Retrieval index over the knowledge-base embeddings: 'bruteforce' (exact)
+# or 'ivf' (approximate, for knowledge bases with many thousands of chunks)
+RAG_INDEX_BACKEND = os.getenv("RAG_INDEX", "bruteforce")
+_retrieval_index = (None, None)  # (knowledge base content hash, index)
+_retrieval_index_lock = threading.Lock()
+
+def get_retrieval_index(knowledge_base: KnowledgeBase):
+    """Vector index for the current knowledge base, rebuilt only when its content changes"""
+    global _retrieval_index
+    content_hash, index = _retrieval_index
+    if content_hash == knowledge_base.content_hash:
+        return index
+    with _retrieval_index_lock:
+        content_hash, index = _retrieval_index
+        if content_hash != knowledge_base.content_hash:
+            # Document embeddings come from the on-disk store; only new or
+            # changed sections are encoded
+            doc_texts = [doc['content'] for doc in knowledge_base.documents]
+            doc_embeddings = embedding_index.embed_documents(doc_texts, encode_texts)
+            index = make_index(RAG_INDEX_BACKEND)
+            if len(doc_texts):
+                index.add(range(len(doc_texts)), doc_embeddings)
+            _retrieval_index = (knowledge_base.content_hash, index)
+    return index
+
+# BM25 index over the same chunks, rebuilt with the vector index
+_lexical_index = (None, None)  # (knowledge base content hash, BM25Index)
+
+def get_lexical_index(knowledge_base: KnowledgeBase) -> BM25Index:
+    """BM25 index for the current knowledge base, rebuilt only when its content changes"""
+    global _lexical_index
+    content_hash, index = _lexical_index
+    if content_hash != knowledge_base.content_hash:
+        index = BM25Index([doc['content'] for doc in knowledge_base.documents])
+        _lexical_index = (knowledge_base.content_hash, index)
+    return index
+
+def warm_up_embeddings():
+    """Load the embedding model, knowledge-base embeddings and retrieval indexes so the first /chat is fast"""
+    encode_texts(["warm up"])
+    knowledge_base = load_knowledge_base()
+    get_retrieval_index(knowledge_base)
+    get_lexical_index(knowledge_base)
+
 # RAG Knowledge Base
-def load_knowledge_base():
-    """Load and prepare knowledge base from files"""
-    knowledge = []
+def load_knowledge_base() -> KnowledgeBase:
+    """Get the cached knowledge base (rebuilt only when a source file changes)"""
+    return knowledge_base_cache.get()
+
+# Retrieval mode: 'hybrid' (dense + BM25), 'dense' or 'bm25'; hybrid
+# scores are combined by reciprocal rank fusion ('rrf') or 'linear'
+# (RAG_HYBRID_ALPHA * dense + (1 - alpha) * normalized BM25)
+RAG_RETRIEVAL = os.getenv("RAG_RETRIEVAL", "hybrid")
+RAG_FUSION = os.getenv("RAG_FUSION", "rrf")
+RAG_HYBRID_ALPHA = float(os.getenv("RAG_HYBRID_ALPHA", "0.5"))
+
+# Employee ids (E0001) in a message add that employee's exact record to
+# the retrieved context
+EMPLOYEE_ID_PATTERN = re.compile(r"\bE\d{3,}\b", re.IGNORECASE)
+
+def mentions_employee_id(query: str) -> bool:
+    return EMPLOYEE_ID_PATTERN.search(query) is not None
+
+def retrieve_relevant_context(query: str, knowledge_base: KnowledgeBase, top_k: int = 3,
+                              query_embedding=None, mode: str = None):
+    """Retrieve most relevant documents using embeddings, BM25 or both"""
+    mode = mode or RAG_RETRIEVAL
+    # Hybrid fuses a deeper candidate list from each side
+    candidates = top_k if mode != 'hybrid' else 2 * top_k
     
-    # Load company policies
-    try:
-        with open('./data/company_policies.txt', 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Split into sections
-            sections = content.split('\n\n')
-            for section in sections:
-                if len(section.strip()) > 50:
-                    knowledge.append({
-                        'content': section.strip(),
-                        'source': 'company_policies.txt'
-                    })
-    except:
-        pass
+    dense = {}
+    if mode in ('dense', 'hybrid'):
+        # Encode query
+        if query_embedding is None:
+            query_embedding = encode_texts([query])[0]
+        
+        # Top k by cosine similarity (dot product of unit vectors)
+        doc_ids, similarities = get_retrieval_index(knowledge_base).search(query_embedding, candidates)
+        dense = {int(i): float(s) for i, s in zip(doc_ids, similarities) if s > 0.2}  # Threshold
     
-    # Load churn insights
-    try:
-        with open('./data/churn_insights.txt', 'r', encoding='utf-8') as f:
-            content = f.read()
-            sections = content.split('\n\n')
-            for section in sections:
-                if len(section.strip()) > 50:
-                    knowledge.append({
-                        'content': section.strip(),
-                        'source': 'churn_insights.txt'
-                    })
-    except:
-        pass
+    lexical = {}
+    if mode in ('bm25', 'hybrid'):
+        doc_ids, bm25_scores = get_lexical_index(knowledge_base).search(query, candidates)
+        lexical = {int(i): float(s) for i, s in zip(doc_ids, bm25_scores)}
     
-    # Load employee data summary
-    try:
-        df = pd.read_csv('./data/employees.csv')
-        
-        # Overall stats
-        total_employees = len(df)
-        high_risk = len(df[df['status'] == 'High Risk'])
-        medium_risk = len(df[df['status'] == 'Medium Risk'])
-        low_risk = len(df[df['status'] == 'Low Risk'])
-        avg_churn = df['churn_probability'].mean()
-        
-        knowledge.append({
-            'content': f"""Employee Statistics:
-Total Employees: {total_employees}
-High Risk: {high_risk} ({high_risk/total_employees*100:.1f}%)
-Medium Risk: {medium_risk} ({medium_risk/total_employees*100:.1f}%)
-Low Risk: {low_risk} ({low_risk/total_employees*100:.1f}%)
-Average Churn Probability: {avg_churn:.1%}""",
-            'source': 'employees.csv'
+    if mode == 'dense':
+        scores = dense
+    elif mode == 'bm25':
+        scores = lexical
+    elif RAG_FUSION == 'linear':
+        scores = linear_fusion(dense, lexical, RAG_HYBRID_ALPHA)
+    else:
+        scores = reciprocal_rank_fusion([list(dense), list(lexical)])
+    
+    relevant_docs = []
+    for idx in sorted(scores, key=scores.get, reverse=True)[:top_k]:
+        doc = knowledge_base.documents[idx]
+        relevant_docs.append({
+            'content': doc['content'],
+            'source': doc['source'],
+            'tokens': doc.get('tokens'),
+            'score': float(scores[idx])
         })
-        
-        # Department stats
-        dept_stats = df.groupby('department').agg({
-            'churn_probability': 'mean',
-            'employee_id': 'count',
-            'satisfaction_level': 'mean'
-        }).round(3)
-        
-        for dept in dept_stats.index:
-            knowledge.append({
-                'content': f"""Department: {dept}
-Employees: {dept_stats.loc[dept, 'employee_id']}
-Average Churn Risk: {dept_stats.loc[dept, 'churn_probability']:.1%}
-Average Satisfaction: {dept_stats.loc[dept, 'satisfaction_level']:.1%}""",
-                'source': 'employees.csv'
-            })
-        
-        # High risk employees
-        high_risk_df = df[df['status'] == 'High Risk'].head(10)
-        if len(high_risk_df) > 0:
-            high_risk_list = ', '.join(high_risk_df['employee_id'].tolist())
-            knowledge.append({
-                'content': f"High Risk Employees (sample): {high_risk_list}",
-                'source': 'employees.csv'
-            })
-    except:
-        pass
     
-    return knowledge
+    return relevant_docs
+
+def find_employee_records(query: str) -> list:
+    """Documents for the employees whose ids appear in the query"""
+    snapshot = employee_store.get()
+    records = []
+    for employee_id in dict.fromkeys(m.upper() for m in EMPLOYEE_ID_PATTERN.findall(query)):
+        position = snapshot.find(employee_id)
+        if position is not None:
+            records.append(build_employee_record(snapshot.df.iloc[position]))
+    return records
+
+def retrieve_with_records(message: str, knowledge_base: KnowledgeBase, top_k: int, query_embedding):
+    """Exact records of the employees named in the message, then the usual retrieval"""
+    try:
+        records = find_employee_records(message)
+    except Exception:
+        records = []
+    return records + retrieve_relevant_context(message, knowledge_base, top_k, query_embedding)
+
+# Retrieve a few more chunks than fit, then pack the best ones into a
+# fixed context budget so prompt size stays bounded
+RETRIEVAL_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKENS", "400"))
 
-def retrieve_relevant_context(query: str, knowledge_base: list, top_k: int = 3):
-    """Retrieve most relevant documents using embeddings"""
-    model = get_embedding_model()
+API_KEY_MISSING_MESSAGE = "⚠️ API key not configured. Please add your Gemini API key to the .env file."
+
+def prepare_message(message: str):
+    """Load the knowledge base and embed one message (runs in embedding_executor)"""
+    return load_knowledge_base(), encode_texts([message])[0]
+
+def build_prompt(message: str, relevant_docs: list):
+    """Build the RAG prompt and the source snippets shown to the user"""
+    context_parts = []
+    sources = []
+    
+    for doc in pack_context(relevant_docs, CONTEXT_TOKEN_BUDGET):
+        context_parts.append(doc['content'])
+        sources.append({
+            'source': doc['source'],
+            'content': doc['content'][:200] + '...' if len(doc['content']) > 200 else doc['content']
+        })
     
-    # Encode query
-    query_embedding = model.encode([query])
+    context = '\n\n'.join(context_parts)
     
-    # Encode all documents
-    doc_texts = [doc['content'] for doc in knowledge_base]
-    doc_embeddings = model.encode(doc_texts)
+    # Create prompt with RAG context
+    prompt = f"""You are an AI assistant for an Employee Insight Portal. Use the following context to answer the user's question.
+
+Context:
+{context}
+
+User Question: {message}
+
+Answer the question based on the context provided. Be helpful, concise, and accurate."""
     
-    # Calculate similarity
-    similarities = cosine_similarity(query_embedding, doc_embeddings)[0]
+    return prompt, sources
+
+async def retrieve_for_chat(message: str):
+    """
+    Embed the message, then either return a cached response or retrieve
+    context. Returns (knowledge_base, query_embedding, cached, relevant_docs);
+    query_embedding is None when the response must not be cached.
+    """
+    loop = asyncio.get_running_loop()
+    knowledge_base, query_embedding = await loop.run_in_executor(
+        embedding_executor, prepare_message, message
+    )
     
-    # Get top k
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
+    # Questions about different employee ids embed almost identically, so
+    # they bypass the semantic cache and get the exact records added
+    if mentions_employee_id(message):
+        relevant_docs = await loop.run_in_executor(
+            embedding_executor, retrieve_with_records,
+            message, knowledge_base, RETRIEVAL_TOP_K, query_embedding
+        )
+        return knowledge_base, None, None, relevant_docs
     
-    relevant_docs = []
-    for idx in top_indices:
-        if similarities[idx] > 0.2:  # Threshold
-            relevant_docs.append({
-                'content': knowledge_base[idx]['content'],
-                'source': knowledge_base[idx]['source'],
-                'score': float(similarities[idx])
-            })
+    # Serve repeated questions from the semantic cache
+    cached = response_cache.get(query_embedding, knowledge_base.content_hash)
+    if cached is not None:
+        return knowledge_base, query_embedding, cached, None
     
-    return relevant_docs
+    # Retrieve relevant context using RAG
+    relevant_docs = await loop.run_in_executor(
+        embedding_executor, retrieve_relevant_context,
+        message, knowledge_base, RETRIEVAL_TOP_K, query_embedding
+    )
+    return knowledge_base, query_embedding, None, relevant_docs
 
 @router.post("/chat")
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     """Chat with RAG-powered Gemini AI assistant"""
     try:
         if not request.message or len(request.message.strip()) == 0:
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        if not api_key:
+        if llm_client is None:
             return {
-                "response": "⚠️ API key not configured. Please add your Gemini API key to the .env file.",
+                "response": API_KEY_MISSING_MESSAGE,
                 "sources": []
             }
         
-        # Load knowledge base
-        knowledge_base = load_knowledge_base()
+        knowledge_base, query_embedding, cached, relevant_docs = await retrieve_for_chat(request.message)
+        if cached is not None:
+            return cached
         
-        # Retrieve relevant context using RAG
-        relevant_docs = retrieve_relevant_context(request.message, knowledge_base, top_k=3)
-        
-        # Build context from retrieved documents
-        context_parts = []
-        sources = []
-        
-        for doc in relevant_docs:
-            context_parts.append(doc['content'])
-            sources.append({
-                'source': doc['source'],
-                'content': doc['content'][:200] + '...' if len(doc['content']) > 200 else doc['content']
-            })
-        
-        context = '\n\n'.join(context_parts)
-        
-        # Create prompt with RAG context
-        prompt = f"""You are an AI assistant for an Employee Insight Portal. Use the following context to answer the user's question.
-
-Context:
-{context}
-
-User Question: {request.message}
+        prompt, sources = build_prompt(request.message, relevant_docs)
 
-Answer the question based on the context provided. Be helpful, concise, and accurate."""
-
-        # Use Gemini with RAG context
-        model_names = ['gemini-2.0-flash-exp', 'gemini-1.5-flash-latest', 'gemini-1.5-flash', 'gemini-pro']
-        response = None
-        
-        for model_name in model_names:
-            try:
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                break
-            except Exception:
-                continue
+        # Use Gemini with RAG context; each model call has its own timeout
+        async with chat_semaphore:
+            response_text = await llm_client.generate(prompt)
         
-        if not response:
-            raise Exception("No available Gemini model found")
-        
-        return {
-            "response": response.text,
+        result = {
+            "response": response_text,
             "sources": sources
         }
+        if query_embedding is not None:
+            response_cache.put(query_embedding, knowledge_base.content_hash, result)
+        return result
     
     except Exception as e:
         return {
             "response": f"Sorry, I encountered an error: {str(e)}",
             "sources": []
         }
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat_events(message: str):
+    """
+    SSE stream for one chat message: a `sources` event as soon as retrieval
+    is done, `token` events as the LLM generates, then `done` (or `error`).
+    """
+    try:
+        if llm_client is None:
+            yield sse_event("sources", [])
+            yield sse_event("token", {"text": API_KEY_MISSING_MESSAGE})
+            yield sse_event("done", {})
+            return
+        
+        knowledge_base, query_embedding, cached, relevant_docs = await retrieve_for_chat(message)
+        if cached is not None:
+            yield sse_event("sources", cached["sources"])
+            yield sse_event("token", {"text": cached["response"]})
+            yield sse_event("done", {})
+            return
+        
+        prompt, sources = build_prompt(message, relevant_docs)
+        yield sse_event("sources", sources)
+        
+        parts = []
+        async with chat_semaphore:
+            async for text in llm_client.stream(prompt):
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        
+        if query_embedding is not None:
+            response_cache.put(query_embedding, knowledge_base.content_hash, {
+                "response": ''.join(parts),
+                "sources": sources
+            })
+        yield sse_event("done", {})
+    
+    except Exception as e:
+        yield sse_event("error", {"message": f"Sorry, I encountered an error: {str(e)}"})
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Streaming /chat: sources first, then response tokens as Server-Sent Events"""
+    if not request.message or len(request.message.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    return StreamingResponse(
+        stream_chat_events(request.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chat/cache/stats")
+def chat_cache_stats():
+    """Hit/miss counters of the semantic response cache, for tuning the threshold"""
+    return response_cache.stats()
@@ -1,17 +1,14 @@
 from fastapi import APIRouter, HTTPException
-import pandas as pd
-import os
+from utils.employee_store import employee_store
 
 router = APIRouter()
 
 def load_employees():
-    """Load employees from CSV"""
-    csv_path = "./data/employees.csv"
-    if not os.path.exists(csv_path):
+    """Get the cached employee snapshot (re-read only when the CSV changes)"""
+    try:
+        return employee_store.get()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Employee data not found")
-    
-    df = pd.read_csv(csv_path)
-    return df
 
 @router.get("/employees")
 def get_employees(
@@ -23,27 +20,18 @@ def get_employees(
 ):
     """Get all employees with optional filters"""
     try:
-        df = load_employees()
-        
-        # Apply filters
-        if department:
-            df = df[df['department'].str.lower() == department.lower()]
+        snapshot = load_employees()
         
-        if risk_level:
-            df = df[df['status'].str.lower() == risk_level.lower()]
-        
-        if search:
-            search_lower = search.lower()
-            df = df[
-                df['name'].str.lower().str.contains(search_lower) |
-                df['employee_id'].str.lower().str.contains(search_lower)
-            ]
+        # Apply filters via the precomputed department/status/search indexes
+        positions = snapshot.filter_positions(
+            department=department, status=risk_level, search=search
+        )
         
         # Pagination
-        total = len(df)
+        total = len(positions)
         start = (page - 1) * limit
         end = start + limit
-        df_page = df.iloc[start:end]
+        df_page = snapshot.rows(positions[start:end])
         
         # Convert to dict
         employees = df_page.to_dict('records')
@@ -60,17 +48,29 @@ def get_employees(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/employees/stats")
+def get_employee_stats():
+    """Aggregate employee statistics for the dashboard (precomputed per data load)"""
+    try:
+        return load_employees().stats
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/employee/{employee_id}")
 def get_employee(employee_id: str):
     """Get single employee by ID"""
     try:
-        df = load_employees()
-        employee = df[df['employee_id'] == employee_id]
+        snapshot = load_employees()
+        position = snapshot.find(employee_id)
         
-        if employee.empty:
+        if position is None:
             raise HTTPException(status_code=404, detail="Employee not found")
         
-        return employee.iloc[0].to_dict()
+        return snapshot.df.iloc[position].to_dict()
     
     except HTTPException:
         raise
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import List
+import itertools
 import pickle
 import os
+import threading
+import numpy as np
 import pandas as pd
+from utils.fused_model import fuse_model
+from utils.model_artifact import load_artifact
 
 router = APIRouter()
 
@@ -10,37 +17,69 @@ router = APIRouter()
 MODEL_PATH = "./models/churn_model_5features.pkl"
 SCALER_PATH = "./models/scaler_5features.pkl"
 ENCODERS_PATH = "./models/label_encoders_5features.pkl"
+# Written by the training scripts: forest + scaler + encoders as mmap-able arrays
+ARTIFACT_PATH = "./models/churn_model_5features.fmodel"
 
 model = None
-scaler = None
-encoders = None
+_model_lock = threading.Lock()
+
+# Feature order the scaler and model were trained on
+FEATURE_COLUMNS = ['tenure', 'MonthlyCharges', 'TotalCharges', 'Contract', 'InternetService']
+# Key of each categorical feature's LabelEncoder in label_encoders_5features.pkl
+ENCODER_KEYS = {'Contract': 'contract', 'InternetService': 'internet'}
+
+# Bulk scoring reads files shaped like data.csv, one chunk at a time
+BULK_INPUT_COLUMNS = ['customerID'] + FEATURE_COLUMNS
+BULK_OUTPUT_COLUMNS = ['customer_id', 'prediction', 'prediction_label', 'probability', 'status', 'error']
+BULK_CHUNK_SIZE = 10000
+# Upper bound for /predict/file, which holds one chunk in memory at a time
+BULK_MAX_CHUNK_SIZE = 100000
+BULK_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def _load_pickle(path: str, what: str):
+    if not os.path.exists(path):
+        raise HTTPException(status_code=500, detail=f"{what} file not found at {path}")
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def _read_model():
+    if os.path.exists(ARTIFACT_PATH):
+        return load_artifact(ARTIFACT_PATH)
+    
+    if not os.path.exists(MODEL_PATH):
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Model file not found at {MODEL_PATH}. Please train the model first using train_5_features_model.py"
+        )
+    forest = _load_pickle(MODEL_PATH, "Model")
+    scaler = _load_pickle(SCALER_PATH, "Scaler")
+    encoders = _load_pickle(ENCODERS_PATH, "Encoders")
+    return fuse_model(
+        forest, scaler,
+        {name: encoders[key] for name, key in ENCODER_KEYS.items()},
+        FEATURE_COLUMNS
+    )
 
 def load_model():
-    """Load the pre-trained churn model and preprocessing objects"""
-    global model, scaler, encoders
-    
-    if model is None:
-        if not os.path.exists(MODEL_PATH):
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Model file not found at {MODEL_PATH}. Please train the model first using train_5_features_model.py"
-            )
-        with open(MODEL_PATH, 'rb') as f:
-            model = pickle.load(f)
+    """
+    Load the fused churn model, which scores raw feature values directly.
+    
+    Memory-maps the versioned artifact written at training time, so
+    workers share its pages and no pickled code runs. For older model
+    directories without one, fuses the separate model, scaler and encoder
+    pickles on load.
+    """
+    global model
     
-    if scaler is None:
-        if not os.path.exists(SCALER_PATH):
-            raise HTTPException(status_code=500, detail=f"Scaler file not found at {SCALER_PATH}")
-        with open(SCALER_PATH, 'rb') as f:
-            scaler = pickle.load(f)
+    if model is not None:
+        return model
     
-    if encoders is None:
-        if not os.path.exists(ENCODERS_PATH):
-            raise HTTPException(status_code=500, detail=f"Encoders file not found at {ENCODERS_PATH}")
-        with open(ENCODERS_PATH, 'rb') as f:
-            encoders = pickle.load(f)
+    # Concurrent first callers must not each load (or half-load) the model
+    with _model_lock:
+        if model is None:
+            model = _read_model()
     
-    return model, scaler, encoders
+    return model
 
 class CustomerData(BaseModel):
     """
@@ -53,6 +92,10 @@ class CustomerData(BaseModel):
     contract: str  # Contract type: "Month-to-month", "One year", or "Two year"
     internet_service: str  # Internet service: "DSL", "Fiber optic", or "No"
 
+class BatchPredictionRequest(BaseModel):
+    """A batch of customers to score in one call"""
+    customers: List[CustomerData]
+
 def get_risk_level(probability: float) -> str:
     """Determine risk level based on churn probability"""
     if probability >= 0.7:
@@ -85,6 +128,157 @@ def get_retention_suggestions(customer_data: dict, probability: float) -> list:
     
     return suggestions if suggestions else ["Customer appears stable - continue regular engagement"]
 
+def encode_features(tenure, monthly_charges, total_charges, contract, internet_service, clf):
+    """
+    Encode raw feature columns (equal-length sequences) into the model's
+    feature matrix. Categorical labels are plain dict lookups; scaling is
+    folded into the model. Raises ValueError for unknown labels.
+    """
+    return clf.encode({
+        'tenure': tenure,
+        'MonthlyCharges': monthly_charges,
+        'TotalCharges': total_charges,
+        'Contract': contract,
+        'InternetService': internet_service
+    })
+
+def score_features(X, clf):
+    """
+    Score an encoded feature matrix with a single predict_proba pass.
+    Labels are derived from the probabilities (argmax, as
+    RandomForestClassifier.predict does) so the forest is only run once.
+
+    Returns (predictions, churn_probabilities) as NumPy arrays.
+    """
+    proba = clf.predict_proba(X)
+    predictions = clf.classes_.take(np.argmax(proba, axis=1))
+    return predictions, proba[:, 1]  # Probability of churn (class 1)
+
+def score_chunk(chunk: pd.DataFrame, clf) -> pd.DataFrame:
+    """
+    Score one chunk of a data.csv-shaped file.
+
+    Blank TotalCharges (new customers) are treated as 0. Rows with missing
+    numeric values or unknown Contract/InternetService labels are not
+    scored; they get an `error` message instead.
+    """
+    tenure = pd.to_numeric(chunk['tenure'], errors='coerce')
+    monthly = pd.to_numeric(chunk['MonthlyCharges'], errors='coerce')
+    total = pd.to_numeric(chunk['TotalCharges'], errors='coerce').fillna(0.0)
+    
+    known_contract = chunk['Contract'].isin(list(clf.categories['Contract']))
+    known_internet = chunk['InternetService'].isin(list(clf.categories['InternetService']))
+    valid = (known_contract & known_internet & tenure.notna() & monthly.notna()).to_numpy()
+    
+    out = pd.DataFrame({
+        'customer_id': chunk['customerID'].to_numpy(),
+        'prediction': pd.array([pd.NA] * len(chunk), dtype='Int64'),
+        'prediction_label': None,
+        'probability': np.nan,
+        'status': None,
+        'error': None,
+    }, columns=BULK_OUTPUT_COLUMNS)
+    
+    if valid.any():
+        X = encode_features(
+            tenure[valid], monthly[valid], total[valid],
+            chunk['Contract'][valid], chunk['InternetService'][valid],
+            clf
+        )
+        predictions, probabilities = score_features(X, clf)
+        out.loc[valid, 'prediction'] = predictions
+        out.loc[valid, 'prediction_label'] = np.where(predictions == 1, 'Churn', 'No Churn')
+        out.loc[valid, 'probability'] = np.round(probabilities, 3)
+        out.loc[valid, 'status'] = [get_risk_level(p) for p in probabilities]
+    
+    if not valid.all():
+        out.loc[~valid, 'error'] = 'Invalid or missing feature values'
+    
+    return out
+
+def iter_scored_file(source, clf, output_format: str = 'ndjson',
+                     chunksize: int = BULK_CHUNK_SIZE):
+    """
+    Read a data.csv-shaped file (path or file object) in chunks and yield
+    the scored rows as NDJSON or CSV text, one piece per chunk. Memory is
+    bounded by the chunk size and the first chunk is emitted before the
+    rest of the file is read.
+    """
+    reader = pd.read_csv(
+        source,
+        usecols=BULK_INPUT_COLUMNS,
+        dtype={'customerID': str, 'Contract': str, 'InternetService': str},
+        chunksize=chunksize
+    )
+    header = True
+    for chunk in reader:
+        scored = score_chunk(chunk, clf)
+        if output_format == 'csv':
+            yield scored.to_csv(index=False, header=header)
+            header = False
+        else:
+            lines = scored.to_json(orient='records', lines=True)
+            # Older pandas versions omit the trailing newline
+            yield lines if lines.endswith('\n') else lines + '\n'
+
+# Synthetic customers scored at startup to validate the model and warm caches
+WARMUP_CUSTOMERS = {
+    'tenure': [2, 12, 48],
+    'MonthlyCharges': [85.0, 70.0, 45.0],
+    'TotalCharges': [170.0, 840.0, 2160.0],
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'InternetService': ['Fiber optic', 'Fiber optic', 'DSL'],
+}
+
+def warm_up_model():
+    """
+    Load the model and score a few synthetic customers, one at a time and
+    as a batch. Raises if the model cannot be loaded or its outputs are
+    not valid probabilities.
+    """
+    clf = load_model()
+    X = clf.encode(WARMUP_CUSTOMERS)
+    
+    for batch in [X[i:i + 1] for i in range(len(X))] + [X]:
+        predictions, probabilities = score_features(batch, clf)
+        if not np.all((probabilities >= 0.0) & (probabilities <= 1.0)):
+            raise ValueError("Model returned probabilities outside [0, 1]")
+        if not np.isin(predictions, clf.classes_).all():
+            raise ValueError("Model returned unknown class labels")
+
+def build_prediction(customer_dict: dict, customer_id: str, contract_encoded, internet_encoded,
+                     prediction, probability) -> dict:
+    """Assemble the API response for one scored customer"""
+    # Get risk level
+    status = get_risk_level(probability)
+    
+    # Prepare data for suggestions
+    suggestion_data = {
+        'contract': contract_encoded,
+        'monthly_charges': customer_dict['monthly_charges'],
+        'tenure': customer_dict['tenure'],
+        'internet_service': internet_encoded
+    }
+    
+    # Get suggestions
+    suggestions = get_retention_suggestions(suggestion_data, probability)
+    
+    return {
+        "customer_id": customer_id,
+        "prediction": int(prediction),
+        "prediction_label": "Churn" if prediction == 1 else "No Churn",
+        "probability": round(float(probability), 3),
+        "status": status,
+        "suggestions": suggestions,
+        "input_features": {
+            "tenure": customer_dict['tenure'],
+            "monthly_charges": customer_dict['monthly_charges'],
+            "total_charges": customer_dict['total_charges'],
+            "contract": customer_dict['contract'],
+            "internet_service": customer_dict['internet_service']
+        }
+    }
+
 @router.post("/predict")
 def predict_churn(customer: CustomerData):
     """
@@ -99,61 +293,76 @@ def predict_churn(customer: CustomerData):
     """
     try:
         # Load model and preprocessing objects
-        clf, scaler_obj, encoders_obj = load_model()
+        clf = load_model()
         
         # Convert to dict
         customer_dict = customer.dict()
         customer_id = customer_dict.pop('customer_id')
         
-        # Encode categorical variables
-        contract_encoded = encoders_obj['contract'].transform([customer_dict['contract']])[0]
-        internet_encoded = encoders_obj['internet'].transform([customer_dict['internet_service']])[0]
+        # Encode features in the order the model expects
+        X = encode_features(
+            [customer_dict['tenure']],
+            [customer_dict['monthly_charges']],
+            [customer_dict['total_charges']],
+            [customer_dict['contract']],
+            [customer_dict['internet_service']],
+            clf
+        )
         
-        # Create feature dataframe in correct order
-        X = pd.DataFrame({
-            'tenure': [customer_dict['tenure']],
-            'MonthlyCharges': [customer_dict['monthly_charges']],
-            'TotalCharges': [customer_dict['total_charges']],
-            'Contract': [contract_encoded],
-            'InternetService': [internet_encoded]
-        })
+        # Scale and predict
+        predictions, probabilities = score_features(X, clf)
         
-        # Scale features
-        X_scaled = scaler_obj.transform(X)
-        
-        # Predict
-        prediction = clf.predict(X_scaled)[0]
-        probability = clf.predict_proba(X_scaled)[0][1]  # Probability of churn (class 1)
+        return build_prediction(
+            customer_dict, customer_id,
+            X[0, clf.feature_names.index('Contract')], X[0, clf.feature_names.index('InternetService')],
+            predictions[0], probabilities[0]
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@router.post("/predict/batch")
+def predict_churn_batch(request: BatchPredictionRequest):
+    """
+    Predict churn for many customers in one call.
+    
+    All customers are encoded and scaled as one matrix and scored with a
+    single predict_proba pass. Returns the same per-customer fields as
+    /predict, in request order.
+    """
+    try:
+        clf = load_model()
         
-        # Get risk level
-        status = get_risk_level(probability)
+        records = [customer.dict() for customer in request.customers]
+        if not records:
+            return {"predictions": [], "count": 0}
         
-        # Prepare data for suggestions
-        suggestion_data = {
-            'contract': contract_encoded,
-            'monthly_charges': customer_dict['monthly_charges'],
-            'tenure': customer_dict['tenure'],
-            'internet_service': internet_encoded
-        }
+        X = encode_features(
+            [r['tenure'] for r in records],
+            [r['monthly_charges'] for r in records],
+            [r['total_charges'] for r in records],
+            [r['contract'] for r in records],
+            [r['internet_service'] for r in records],
+            clf
+        )
+        predictions, probabilities = score_features(X, clf)
         
-        # Get suggestions
-        suggestions = get_retention_suggestions(suggestion_data, probability)
+        contract_codes = X[:, clf.feature_names.index('Contract')]
+        internet_codes = X[:, clf.feature_names.index('InternetService')]
+        results = [
+            build_prediction(
+                record, record.pop('customer_id'),
+                contract_codes[i], internet_codes[i],
+                predictions[i], probabilities[i]
+            )
+            for i, record in enumerate(records)
+        ]
         
-        return {
-            "customer_id": customer_id,
-            "prediction": int(prediction),
-            "prediction_label": "Churn" if prediction == 1 else "No Churn",
-            "probability": round(float(probability), 3),
-            "status": status,
-            "suggestions": suggestions,
-            "input_features": {
-                "tenure": customer_dict['tenure'],
-                "monthly_charges": customer_dict['monthly_charges'],
-                "total_charges": customer_dict['total_charges'],
-                "contract": customer_dict['contract'],
-                "internet_service": customer_dict['internet_service']
-            }
-        }
+        return {"predictions": results, "count": len(results)}
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
@@ -161,3 +370,41 @@ def predict_churn(customer: CustomerData):
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@router.post("/predict/file")
+def predict_churn_file(
+    file: UploadFile = File(...),
+    format: str = 'ndjson',
+    chunksize: int = BULK_CHUNK_SIZE
+):
+    """
+    Score an uploaded CSV shaped like data.csv (customerID, tenure,
+    MonthlyCharges, TotalCharges, Contract, InternetService, ...).
+    
+    The file is read in chunks and the results are streamed back as NDJSON
+    (default) or CSV while later chunks are still being scored. The first
+    chunk is scored before responding, so a file with missing columns or
+    unparseable values gets a 400 instead of a truncated 200.
+    """
+    if format not in BULK_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    if not 1 <= chunksize <= BULK_MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=400, detail=f"chunksize must be between 1 and {BULK_MAX_CHUNK_SIZE}")
+    
+    try:
+        clf = load_model()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+    
+    pieces = iter_scored_file(file.file, clf, format, chunksize)
+    try:
+        first = next(pieces, '')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid file: {str(e)}")
+    
+    return StreamingResponse(
+        itertools.chain([first], pieces),
+        media_type=BULK_MEDIA_TYPES[format]
+    )
@@ -0,0 +1,48 @@
+"""
+Bulk churn scoring for customer files shaped like data.csv.
+
+Reads the input in chunks (so files larger than memory are fine), applies
+the same 5-feature encoding and scaling as POST /predict, and writes
+NDJSON or CSV as each chunk is scored.
+
+Usage (from the backend directory):
+    python score_customers.py ../../data.csv -o scores.ndjson
+    python score_customers.py customers.csv --format csv --chunksize 50000 > scores.csv
+    cat customers.csv | python score_customers.py - --format csv
+"""
+import argparse
+import os
+import sys
+
+from routes.predict import (load_model, iter_scored_file, ARTIFACT_PATH, BULK_CHUNK_SIZE, BULK_MEDIA_TYPES,
+                            MODEL_PATH)
+from utils.model_artifact import load_artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a customer CSV with the 5-feature churn model")
+    parser.add_argument("input", help="CSV file shaped like data.csv, or '-' for stdin")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=sorted(BULK_MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--chunksize", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    # One offline process, so unpickling the sklearn forest once pays off on big chunks
+    if os.path.exists(ARTIFACT_PATH):
+        clf = load_artifact(ARTIFACT_PATH, fallback_path=MODEL_PATH)
+    else:
+        clf = load_model()
+
+    source = sys.stdin if args.input == "-" else args.input
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for piece in iter_scored_file(source, clf, args.format, args.chunksize):
+            out.write(piece)
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Okapi BM25 over the knowledge-base chunks, and fusion with dense scores.
+
+The inverted index stores, for every term, the documents containing it
+and their precomputed BM25 weight, so a query is a handful of vector adds
+and no embedding model is involved.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+
+from utils.vector_index import top_k
+
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return TERM_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Precomputed inverted index: term -> (document ids, BM25 weights)"""
+
+    def __init__(self, texts: list, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(texts)
+
+        term_counts = [Counter(tokenize(text)) for text in texts]
+        doc_lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float64)
+        avg_length = doc_lengths.mean() if self.n_docs else 0.0
+        # Length normalization term of the BM25 denominator, per document
+        norms = k1 * (1.0 - b + b * doc_lengths / (avg_length or 1.0))
+
+        postings = {}
+        for doc_id, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        self.postings = {}
+        for term, entries in postings.items():
+            doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int64)
+            tf = np.array([tf for _, tf in entries], dtype=np.float64)
+            idf = np.log(1.0 + (self.n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            weights = idf * tf * (k1 + 1.0) / (tf + norms[doc_ids])
+            self.postings[term] = (doc_ids, weights)
+
+    def __len__(self):
+        return self.n_docs
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for `query`"""
+        scores = np.zeros(self.n_docs)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return scores
+
+    def search(self, query: str, k: int):
+        """Return (ids, scores) of the k best documents with a non-zero score"""
+        scores = self.scores(query)
+        best = top_k(scores, k)
+        best = best[scores[best] > 0.0]
+        return best, scores[best]
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = 60) -> dict:
+    """Combine ranked id lists: score(id) = sum over lists of 1 / (k + rank)"""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def linear_fusion(dense: dict, lexical: dict, alpha: float = 0.5) -> dict:
+    """
+    alpha * dense similarity + (1 - alpha) * BM25 score scaled to [0, 1]
+    by the best lexical match. Ids missing from one side score 0 there.
+    """
+    top_lexical = max(lexical.values(), default=0.0) or 1.0
+    return {
+        doc_id: alpha * dense.get(doc_id, 0.0) + (1.0 - alpha) * lexical.get(doc_id, 0.0) / top_lexical
+        for doc_id in set(dense) | set(lexical)
+    }
@@ -0,0 +1,128 @@
+"""
+Chunking of the RAG text corpus and packing of retrieved chunks into a
+prompt context budget.
+
+Token counts are estimated as words plus punctuation marks, which tracks
+LLM tokenizers closely enough for budgeting without loading one.
+"""
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+NUMBERED_HEADING = re.compile(r"^\d+\.\s+[^a-z]+$")
+
+DEFAULT_CHUNK_TOKENS = 120
+DEFAULT_OVERLAP_TOKENS = 20
+MIN_CHUNK_TOKENS = 8
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def is_heading(line: str) -> bool:
+    """Section headings are all-caps lines, optionally numbered ("2. TENURE PATTERNS")"""
+    line = line.strip()
+    if not line or len(line) > 80 or line.startswith('-'):
+        return False
+    return bool(NUMBERED_HEADING.match(line)) or (line.isupper() and not line.endswith(':'))
+
+
+def _split_long_line(line: str, max_tokens: int) -> list:
+    """Break a single line longer than the chunk size into word windows"""
+    words = line.split()
+    pieces, current = [], []
+    for word in words:
+        current.append(word)
+        if count_tokens(' '.join(current)) >= max_tokens:
+            pieces.append(' '.join(current))
+            current = []
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+
+def _sections(content: str):
+    """Yield (heading path, body lines) for each section of a document"""
+    title, heading, lines = None, None, []
+    for line in content.splitlines():
+        stripped = line.strip()
+        if is_heading(stripped):
+            if lines:
+                yield [h for h in (title, heading) if h], lines
+                lines = []
+            if title is None:
+                title = stripped
+            else:
+                heading = stripped
+        elif stripped or (lines and lines[-1]):
+            # Keep single blank lines as paragraph breaks
+            lines.append(stripped)
+    if lines:
+        yield [h for h in (title, heading) if h], lines
+
+
+def chunk_text(content: str, source: str, chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+               overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> list:
+    """
+    Split a document into chunks of about `chunk_tokens` tokens.
+
+    Chunks never cross a section heading and are built from whole lines
+    (list items stay intact). Consecutive chunks of one section share about
+    `overlap_tokens` tokens, and every chunk starts with its heading path
+    ("TITLE > SECTION") so it can be retrieved and read on its own.
+    """
+    documents = []
+    for headings, lines in _sections(content):
+        context = ' > '.join(headings)
+        budget = max(1, chunk_tokens - count_tokens(context))
+
+        units = []
+        for line in lines:
+            units.extend(_split_long_line(line, budget) if count_tokens(line) > budget else [line])
+        while units and not units[-1]:
+            units.pop()
+
+        start = 0
+        while start < len(units):
+            end, size = start, 0
+            while end < len(units) and (end == start or size + count_tokens(units[end]) <= budget):
+                size += count_tokens(units[end])
+                end += 1
+
+            body = '\n'.join(units[start:end]).strip()
+            if count_tokens(body) >= MIN_CHUNK_TOKENS:
+                text = f"{context}\n{body}" if context else body
+                documents.append({
+                    'content': text,
+                    'source': source,
+                    'tokens': count_tokens(text),
+                })
+            if end >= len(units):
+                break
+
+            # Step back over trailing lines to overlap with the next chunk
+            next_start, carried = end, 0
+            while next_start - 1 > start and carried + count_tokens(units[next_start - 1]) <= overlap_tokens:
+                next_start -= 1
+                carried += count_tokens(units[next_start])
+            start = next_start
+    return documents
+
+
+def pack_context(documents: list, budget_tokens: int) -> list:
+    """
+    Choose retrieved documents (best first) whose combined size fits in
+    `budget_tokens`. Documents that would overflow the budget are skipped;
+    if not even the best one fits, it is truncated to the budget.
+    """
+    packed, used = [], 0
+    for doc in documents:
+        tokens = doc.get('tokens') or count_tokens(doc['content'])
+        if used + tokens <= budget_tokens:
+            packed.append(doc)
+            used += tokens
+    if not packed and documents and budget_tokens > 0:
+        doc = documents[0]
+        cut = list(TOKEN_PATTERN.finditer(doc['content']))[budget_tokens - 1].end()
+        packed.append({**doc, 'content': doc['content'][:cut], 'tokens': budget_tokens})
+    return packed
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+EMBEDDINGS_DIR = "./data/embeddings"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingIndex:
+    """
+    Normalized document embeddings persisted on disk, keyed by content hash.
+
+    Only documents whose text is not already in the store are encoded; the
+    rest are served from a memory-mapped .npy file, so the knowledge base is
+    encoded once rather than on every chat message. Because rows are unit
+    length, cosine similarity is a single matrix-vector product.
+    """
+
+    def __init__(self, directory: str = EMBEDDINGS_DIR, model_name: str = 'all-MiniLM-L6-v2'):
+        self.directory = directory
+        self.model_name = model_name
+        self.matrix_path = os.path.join(directory, 'doc_embeddings.npy')
+        self.meta_path = os.path.join(directory, 'doc_embeddings.json')
+        self._rows = None  # content hash -> row in self._matrix
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self._rows, self._matrix = {}, None
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('model') != self.model_name:
+                return
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+            if len(matrix) != len(meta['hashes']):
+                return
+        except (OSError, ValueError, KeyError):
+            return
+        self._matrix = matrix
+        self._rows = {h: i for i, h in enumerate(meta['hashes'])}
+
+    def _save(self, hashes, matrix):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_matrix = self.matrix_path + '.tmp.npy'
+        tmp_meta = self.meta_path + '.tmp'
+        np.save(tmp_matrix, matrix)
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model_name, 'hashes': hashes}, f)
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_meta, self.meta_path)
+
+    def embed_documents(self, texts: list, encode) -> np.ndarray:
+        """
+        Return unit-length embeddings for `texts`, shape (len(texts), dim).
+
+        `encode(list_of_texts)` is only called for texts whose content hash
+        is not stored yet; the store is then rewritten to hold exactly the
+        current documents.
+        """
+        hashes = [content_hash(text) for text in texts]
+
+        with self._lock:
+            if self._rows is None:
+                self._load()
+
+            if not texts:
+                # Nothing to embed; keep the store for when documents come back
+                dim = self._matrix.shape[1] if self._matrix is not None else 0
+                return np.empty((0, dim), dtype=np.float32)
+
+            missing = [i for i, h in enumerate(hashes) if h not in self._rows]
+            if not missing and len(self._rows) == len(set(hashes)):
+                return np.asarray(self._matrix[[self._rows[h] for h in hashes]])
+
+            new_vectors = {}
+            if missing:
+                encoded = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32)
+                norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+                encoded /= np.where(norms == 0.0, 1.0, norms)
+                new_vectors = {hashes[i]: encoded[j] for j, i in enumerate(missing)}
+
+            # Keep exactly the current documents, in order, de-duplicated
+            unique_hashes = list(dict.fromkeys(hashes))
+            matrix = np.stack([
+                new_vectors[h] if h in new_vectors else self._matrix[self._rows[h]]
+                for h in unique_hashes
+            ]) if unique_hashes else np.empty((0, 0), dtype=np.float32)
+
+            # Drop the old memory map first; Windows cannot replace a mapped file
+            self._matrix = None
+            self._save(unique_hashes, matrix)
+
+            self._matrix = matrix
+            self._rows = {h: i for i, h in enumerate(unique_hashes)}
+            return matrix[[self._rows[h] for h in hashes]]
@@ -0,0 +1,173 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.search_index import SubstringIndex
+
+EMPLOYEES_CSV_PATH = "./data/employees.csv"
+
+
+class EmployeeSnapshot:
+    """
+    Immutable view of the employee data as of one load of the CSV.
+
+    The DataFrame is shared by every request, so routes must treat it as
+    read-only and only materialize the rows they actually return.
+    """
+
+    def __init__(self, df: pd.DataFrame, mtime: float):
+        self.df = df
+        self.mtime = mtime
+        self.id_index = build_id_index(df)
+        self.all_positions = np.arange(len(df))
+        self.department_index = build_value_index(df['department'])
+        self.status_index = build_value_index(df['status'])
+        self.search_index = SubstringIndex(df['name'], df['employee_id'])
+        self.stats = build_stats(df)
+
+    def __len__(self):
+        return len(self.df)
+
+    def rows(self, positions) -> pd.DataFrame:
+        """Return the rows at the given positions (copies only those rows)"""
+        return self.df.take(positions)
+
+    def find(self, employee_id: str):
+        """Return the row position of an employee, or None if unknown"""
+        return self.id_index.get(employee_id)
+
+    def filter_positions(self, department: str = None, status: str = None,
+                         search: str = None) -> np.ndarray:
+        """
+        Sorted row positions matching the given department/status
+        (case-insensitive) and containing `search` in the name or
+        employee_id, combined by intersecting the precomputed position
+        arrays instead of scanning whole columns.
+        """
+        candidates = []
+        if department:
+            candidates.append(self.department_index.get(department.lower(), self.all_positions[:0]))
+        if status:
+            candidates.append(self.status_index.get(status.lower(), self.all_positions[:0]))
+        if search:
+            candidates.append(self.search_index.search(search))
+
+        if not candidates:
+            return self.all_positions
+
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for matches in candidates[1:]:
+            positions = np.intersect1d(positions, matches, assume_unique=True)
+        return positions
+
+
+def build_id_index(df: pd.DataFrame) -> dict:
+    """Map each employee_id to its row position (first occurrence wins)"""
+    index = {}
+    for position, employee_id in enumerate(df['employee_id'].tolist()):
+        index.setdefault(employee_id, position)
+    return index
+
+
+def build_value_index(column: pd.Series) -> dict:
+    """Map each lowercased value of a column to the sorted row positions holding it"""
+    groups = column.groupby(column.str.lower().to_numpy(), sort=False).indices
+    return {value: np.asarray(positions) for value, positions in groups.items()}
+
+
+TENURE_BINS = [-np.inf, 12, 24, 36, np.inf]
+TENURE_LABELS = ['0-12 months', '13-24 months', '25-36 months', '37+ months']
+
+def _histogram(values: pd.Series, bins: int = 10) -> dict:
+    counts, edges = np.histogram(values.dropna(), bins=bins, range=(0.0, 1.0))
+    return {
+        'bin_edges': [round(float(edge), 2) for edge in edges],
+        'counts': counts.tolist(),
+    }
+
+
+def build_stats(df: pd.DataFrame) -> dict:
+    """Dashboard aggregates, computed once per load and served as-is"""
+    total = len(df)
+
+    dept_stats = df.groupby('department').agg(
+        employees=('employee_id', 'count'),
+        avg_churn_probability=('churn_probability', 'mean'),
+        avg_satisfaction=('satisfaction_level', 'mean'),
+    )
+    departments = [
+        {
+            'department': dept,
+            'employees': int(row['employees']),
+            'avg_churn_probability': round(float(row['avg_churn_probability']), 4),
+            'avg_satisfaction': round(float(row['avg_satisfaction']), 4),
+        }
+        for dept, row in dept_stats.iterrows()
+    ]
+
+    tenure_bucket = pd.cut(df['tenure'], bins=TENURE_BINS, labels=TENURE_LABELS)
+    tenure_stats = df.groupby(tenure_bucket, observed=False)['churn_probability'].agg(['count', 'mean'])
+    tenure_groups = [
+        {
+            'tenure': label,
+            'employees': int(row['count']),
+            'avg_churn_probability': round(float(row['mean']), 4) if row['count'] else 0.0,
+        }
+        for label, row in tenure_stats.iterrows()
+    ]
+
+    return {
+        'total_employees': total,
+        'avg_churn_probability': round(float(df['churn_probability'].mean()), 4) if total else 0.0,
+        'avg_satisfaction': round(float(df['satisfaction_level'].mean()), 4) if total else 0.0,
+        'status_counts': {
+            status: int(count) for status, count in df['status'].value_counts().items()
+        },
+        'departments': departments,
+        'tenure_groups': tenure_groups,
+        'churn_probability_histogram': _histogram(df['churn_probability']),
+        'satisfaction_histogram': _histogram(df['satisfaction_level']),
+    }
+
+
+def _build_snapshot(csv_path: str, mtime: float) -> EmployeeSnapshot:
+    """Parse the CSV and build a snapshot of it"""
+    df = pd.read_csv(csv_path)
+    return EmployeeSnapshot(df, mtime)
+
+
+class EmployeeStore:
+    """
+    Process-wide cache of the employee CSV.
+
+    The file is parsed once and re-parsed only when its mtime changes, so
+    a request costs one os.stat() instead of a full read_csv().
+    """
+
+    def __init__(self, csv_path: str = EMPLOYEES_CSV_PATH):
+        self.csv_path = csv_path
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> EmployeeSnapshot:
+        """Return the current snapshot, reloading it if the file changed"""
+        try:
+            mtime = os.stat(self.csv_path).st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Employee data not found at {self.csv_path}")
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.mtime == mtime:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            if self._snapshot is None or self._snapshot.mtime != mtime:
+                self._snapshot = _build_snapshot(self.csv_path, mtime)
+            return self._snapshot
+
+
+employee_store = EmployeeStore()
@@ -0,0 +1,166 @@
+import numpy as np
+
+# Child index sklearn uses to mark leaf nodes (TREE_LEAF)
+LEAF = -1
+
+# Above this many rows sklearn's Cython traversal beats the NumPy walk
+# (see benchmarks/bench_forest_engine.py), so big batches are delegated
+# to the original estimator when one is available: CompiledForest.fallback,
+# or the forest a FusedModel loads lazily next to its artifact
+FALLBACK_MIN_ROWS = 1000
+# From this many rows, walking one tree at a time over column-major inputs
+# is faster than walking every (row, tree) pair at once: the gathers stay
+# within one tree's nodes and one column of X
+TREE_WALK_MIN_ROWS = 2000
+
+
+class CompiledForest:
+    """
+    A trained RandomForestClassifier flattened into NumPy node arrays.
+
+    All trees are concatenated into one set of arrays (child indices are
+    global, and leaves are their own children), so a batch is scored by
+    walking every (row, tree) pair one level per step with fancy indexing
+    instead of calling into scikit-learn tree by tree. predict_proba
+    matches the original forest exactly: inputs are cast to float32 like sklearn does, leaf values are
+    normalized the same way, and tree probabilities are summed in tree
+    order before dividing by the number of trees.
+
+    The per-call overhead is tiny, which is what matters for /predict.
+    Batches of TREE_WALK_MIN_ROWS or more are walked one tree at a time
+    instead, with the same result. For batches of FALLBACK_MIN_ROWS or
+    more the original forest (if kept as `fallback`) is used instead.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth,
+                 missing_left, fallback=None, float32_inputs=True):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.missing_left = missing_left
+        self.fallback = fallback
+        # False once thresholds have been rewritten for raw float64 inputs
+        self.float32_inputs = float32_inputs
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        X = np.asarray(X, dtype=np.float32 if self.float32_inputs else np.float64)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_estimators)).copy()
+        has_missing = np.isnan(flat_X).any()
+
+        # Leaves loop back to themselves, so every walk can take max_depth steps
+        for _ in range(self.max_depth):
+            x = flat_X[row_offsets + self.feature[nodes]]
+            go_right = x > self.threshold[nodes]
+            if has_missing:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.missing_left[nodes[missing]]
+            nodes = self.children[nodes, go_right.view(np.int8)]
+
+        return nodes
+
+    def _predict_proba_by_tree(self, X) -> np.ndarray:
+        """predict_proba for large batches: every row through one tree, then the next"""
+        X = np.asarray(X, dtype=np.float32 if self.float32_inputs else np.float64)
+        n_rows = len(X)
+        # Column-major, so feature f of row i is columns[f * n_rows + i]
+        columns = X.T.ravel()
+        rows = np.arange(n_rows)
+        children = self.children.ravel()
+        has_missing = np.isnan(columns).any()
+        proba = np.zeros((n_rows, self.value.shape[1]))
+
+        for root in self.roots:
+            nodes = np.full(n_rows, root)
+            for _ in range(self.max_depth):
+                x = columns[self.feature[nodes] * n_rows + rows]
+                go_right = x > self.threshold[nodes]
+                if has_missing:
+                    missing = np.isnan(x)
+                    go_right[missing] = ~self.missing_left[nodes[missing]]
+                nodes = children[2 * nodes + go_right]
+            proba += self.value[nodes]
+        proba /= self.n_estimators
+        return proba
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.fallback is not None and len(X) >= FALLBACK_MIN_ROWS:
+            return self.fallback.predict_proba(X)
+        if len(X) >= TREE_WALK_MIN_ROWS:
+            return self._predict_proba_by_tree(X)
+
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]))
+        for t in range(self.n_estimators):
+            proba += self.value[leaves[:, t]]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def compile_forest(forest, keep_fallback: bool = True) -> CompiledForest:
+    """
+    Flatten a fitted single-output sklearn forest classifier into a
+    CompiledForest, optionally keeping the forest for large batches.
+    """
+    features, thresholds, children, values, missing_left, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == LEAF
+        node_ids = np.arange(tree.node_count) + offset
+
+        # scikit-learn >= 1.4 stores class fractions in tree_.value; older
+        # versions store weighted counts and normalize them at predict time
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        if np.allclose(normalizer, 1.0):
+            normalizer = np.ones_like(normalizer)
+        normalizer[normalizer == 0.0] = 1.0
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+        thresholds.append(tree.threshold.astype(np.float64))
+        children.append(np.column_stack([
+            np.where(is_leaf, node_ids, tree.children_left + offset),
+            np.where(is_leaf, node_ids, tree.children_right + offset),
+        ]).astype(np.intp))
+        values.append(value / normalizer)
+        # Where NaNs go at each split (sklearn >= 1.3; older versions reject NaN)
+        missing_left.append(np.asarray(
+            getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool
+        ))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        children=np.concatenate(children),
+        value=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.intp),
+        classes=np.asarray(forest.classes_),
+        max_depth=max_depth,
+        missing_left=np.concatenate(missing_left),
+        fallback=forest if keep_fallback else None,
+    )
@@ -0,0 +1,168 @@
+import logging
+import threading
+
+import numpy as np
+
+from utils.forest_engine import CompiledForest, compile_forest, FALLBACK_MIN_ROWS
+
+logger = logging.getLogger(__name__)
+
+_INT64_MIN = np.int64(np.iinfo(np.int64).min)
+_SEARCH_LIMIT = 1e308
+
+
+def _to_ordered(x: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same ordering"""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, _INT64_MIN - bits, bits)
+
+
+def _from_ordered(keys: np.ndarray) -> np.ndarray:
+    bits = np.where(keys < 0, _INT64_MIN - keys, keys)
+    return bits.view(np.float64)
+
+
+def fold_scaler_thresholds(threshold, mean, scale) -> np.ndarray:
+    """
+    Rewrite split thresholds on scaled features as thresholds on raw ones.
+
+    sklearn routes a row left when float32((x - mean) / scale) <= t. That
+    expression is monotone in x, so the raw-space split is x <= x* where x*
+    is the largest float64 still going left. x* is found by bisecting the
+    ordered bit patterns of float64 (about 64 vectorized steps), which makes
+    the folded tree take exactly the same branches as scaler + forest.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), threshold.shape)
+    scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), threshold.shape)
+
+    def goes_left(keys):
+        x = _from_ordered(keys)
+        with np.errstate(over='ignore', invalid='ignore'):
+            scaled = ((x - mean) / scale).astype(np.float32).astype(np.float64)
+        return scaled <= threshold
+
+    lo = np.full(threshold.shape, _to_ordered(np.float64(-_SEARCH_LIMIT)))
+    hi = np.full(threshold.shape, _to_ordered(np.float64(_SEARCH_LIMIT)))
+    all_left = goes_left(hi)
+    none_left = ~goes_left(lo)
+
+    # Invariant: lo goes left, hi goes right
+    active = ~(all_left | none_left)
+    while True:
+        searching = active & (hi > lo + 1)
+        if not searching.any():
+            break
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(mid)
+        lo = np.where(searching & left, mid, lo)
+        hi = np.where(searching & ~left, mid, hi)
+
+    folded = _from_ordered(lo)
+    folded = np.where(all_left, np.inf, folded)
+    return np.where(none_left, -np.inf, folded)
+
+
+class FusedModel:
+    """
+    Scaler + label encoders + forest collapsed into one object that scores
+    raw feature values.
+
+    Categorical columns are encoded with plain dict lookups and the
+    StandardScaler is folded into the tree thresholds, so a prediction is a
+    single CompiledForest walk. Probabilities are identical to
+    encoder -> scaler -> RandomForestClassifier.predict_proba.
+
+    Batches of FALLBACK_MIN_ROWS or more are scored by the original sklearn
+    forest when there is one, which is faster there: either `fallback`
+    itself, or the forest returned by `fallback_loader` on the first large
+    batch. Without either, the arrays score every batch.
+    """
+
+    def __init__(self, forest: CompiledForest, feature_names, categories: dict,
+                 scaler_mean, scaler_scale, fallback=None, fallback_loader=None):
+        self.forest = forest
+        self.feature_names = list(feature_names)
+        self.categories = categories
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.fallback = fallback
+        self.fallback_loader = fallback_loader
+        self._fallback_lock = threading.Lock()
+
+    @property
+    def classes_(self):
+        return self.forest.classes_
+
+    def encode(self, columns: dict) -> np.ndarray:
+        """
+        Build the raw feature matrix from {feature_name: sequence of values}.
+        Raises ValueError for categorical labels not seen in training.
+        """
+        n_rows = len(columns[self.feature_names[0]])
+        X = np.empty((n_rows, len(self.feature_names)), dtype=np.float64)
+        for j, name in enumerate(self.feature_names):
+            mapping = self.categories.get(name)
+            if mapping is None:
+                X[:, j] = columns[name]
+                continue
+            try:
+                X[:, j] = [mapping[value] for value in columns[name]]
+            except KeyError as e:
+                raise ValueError(f"Unknown {name} value {e.args[0]!r}; expected one of {list(mapping)}")
+        return X
+
+    def large_batch_model(self):
+        """The sklearn forest for large batches, or None to use the arrays for every batch size"""
+        if self.fallback is None and self.fallback_loader is not None:
+            with self._fallback_lock:
+                if self.fallback is None and self.fallback_loader is not None:
+                    try:
+                        self.fallback = self.fallback_loader()
+                    except Exception as e:
+                        logger.warning("Large-batch forest unavailable, scoring with the compiled arrays: %s", e)
+                    self.fallback_loader = None
+        return self.fallback
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) >= FALLBACK_MIN_ROWS:
+            fallback = self.large_batch_model()
+            if fallback is not None:
+                # Same arithmetic as StandardScaler.transform
+                return fallback.predict_proba((X - self.scaler_mean) / self.scaler_scale)
+        return self.forest.predict_proba(X)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def fuse_model(forest, scaler, categorical_encoders: dict, feature_names,
+               keep_fallback: bool = True) -> FusedModel:
+    """
+    Fuse a fitted forest, its StandardScaler and LabelEncoders.
+
+    `categorical_encoders` maps a feature name (e.g. 'Contract') to the
+    LabelEncoder used for that column; `feature_names` is the column order
+    the scaler and forest were trained on.
+    """
+    compiled = compile_forest(forest, keep_fallback=False)
+
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(feature_names))
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(feature_names))
+    node_feature = compiled.feature
+
+    compiled.threshold = fold_scaler_thresholds(
+        compiled.threshold, mean[node_feature], scale[node_feature]
+    )
+    compiled.float32_inputs = False
+
+    categories = {
+        name: {label: code for code, label in enumerate(encoder.classes_.tolist())}
+        for name, encoder in categorical_encoders.items()
+    }
+
+    return FusedModel(
+        compiled, feature_names, categories, mean, scale,
+        fallback=forest if keep_fallback else None
+    )
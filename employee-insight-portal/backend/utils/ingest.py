@@ -0,0 +1,190 @@
+"""
+Typed, chunked ingestion of data.csv-shaped customer exports, with a
+columnar cache.
+
+Every column has an explicit dtype (SCHEMA): yes/no and service columns
+are categoricals with fixed categories, so codes are consistent across
+chunks and take one byte per row; tenure and SeniorCitizen are small
+integers and the charges are float32. The blank TotalCharges of new
+customers parse straight to NaN. A value outside a column's categories
+raises ValueError rather than being read as missing.
+
+build_column_cache() streams the CSV once, chunk by chunk, into one .npy
+file per column (category codes as int8). load_frame() memory-maps those
+files, so later loads read no CSV and copy nothing: the DataFrame's
+columns are views of the page cache.
+"""
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+YES_NO = ['No', 'Yes']
+INTERNET_ADDON = ['No', 'No internet service', 'Yes']
+
+# column -> numpy dtype name, or the list of categories of a categorical column
+SCHEMA = {
+    'customerID': 'str',
+    'gender': ['Female', 'Male'],
+    'SeniorCitizen': 'int8',
+    'Partner': YES_NO,
+    'Dependents': YES_NO,
+    'tenure': 'int16',
+    'PhoneService': YES_NO,
+    'MultipleLines': ['No', 'No phone service', 'Yes'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': INTERNET_ADDON,
+    'OnlineBackup': INTERNET_ADDON,
+    'DeviceProtection': INTERNET_ADDON,
+    'TechSupport': INTERNET_ADDON,
+    'StreamingTV': INTERNET_ADDON,
+    'StreamingMovies': INTERNET_ADDON,
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaperlessBilling': YES_NO,
+    'PaymentMethod': ['Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'],
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    'Churn': YES_NO,
+}
+# Bump when SCHEMA or the cache layout changes so stale caches are ignored
+CACHE_VERSION = 2
+CHUNK_SIZE = 500_000
+# Fixed .npy header size, so the header can be written after the row count is known
+NPY_HEADER_SIZE = 128
+
+
+def pandas_dtype(column: str):
+    spec = SCHEMA[column]
+    if isinstance(spec, list):
+        return pd.CategoricalDtype(spec)
+    return spec
+
+
+def iter_chunks(source, columns: list = None, chunksize: int = CHUNK_SIZE):
+    """
+    Read a data.csv-shaped file (path or file object) as typed DataFrames
+    of up to chunksize rows. Raises ValueError on a categorical value the
+    schema does not list; empty cells stay NaN.
+    """
+    columns = list(columns or SCHEMA)
+    unknown = set(columns) - set(SCHEMA)
+    if unknown:
+        raise ValueError(f"Columns not in the ingestion schema: {sorted(unknown)}")
+    # Categoricals are parsed with the categories found in each chunk, then
+    # checked and recoded to the schema's, so no label silently becomes NaN
+    reader = pd.read_csv(
+        source,
+        usecols=columns,
+        dtype={column: 'category' if isinstance(SCHEMA[column], list) else SCHEMA[column] for column in columns},
+        na_values={'TotalCharges': [' ', '']},
+        chunksize=chunksize,
+    )
+    rows = 0
+    for chunk in reader:
+        for column in columns:
+            if not isinstance(SCHEMA[column], list):
+                continue
+            unexpected = set(chunk[column].cat.categories) - set(SCHEMA[column])
+            if unexpected:
+                # +2: one-based, after the header line
+                line = rows + int(np.flatnonzero(chunk[column].isin(unexpected))[0]) + 2
+                raise ValueError(
+                    f"Unknown {column} value(s) {sorted(unexpected)} (first on line {line}); "
+                    f"expected one of {SCHEMA[column]}"
+                )
+            chunk[column] = chunk[column].cat.set_categories(SCHEMA[column])
+        rows += len(chunk)
+        yield chunk
+
+
+def read_typed_csv(source, columns: list = None, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Read a whole file with the schema dtypes (chunked, so the object-dtype text is never held at once)"""
+    return pd.concat(iter_chunks(source, columns, chunksize), ignore_index=True)
+
+
+def cacheable_columns() -> list:
+    """Columns with a fixed-width representation; string columns are not cached"""
+    return [column for column, spec in SCHEMA.items() if spec != 'str']
+
+
+def _storage_dtype(column: str) -> np.dtype:
+    return np.dtype('int8') if isinstance(SCHEMA[column], list) else np.dtype(SCHEMA[column])
+
+
+def _npy_header(dtype: np.dtype, n_rows: int) -> bytes:
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (n_rows,)})
+    header = header.ljust(NPY_HEADER_SIZE - 11) + '\n'
+    return np.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def column_cache_dir(path: str, cache_dir: str) -> str:
+    """Cache directory for one CSV; changes with the file and the schema"""
+    stat = os.stat(path)
+    key = json.dumps({
+        'version': CACHE_VERSION,
+        'data': [os.path.abspath(path), stat.st_size, stat.st_mtime_ns],
+        'schema': SCHEMA,
+    }, sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f'columns_{digest}')
+
+
+def build_column_cache(path: str, cache_dir: str, chunksize: int = CHUNK_SIZE) -> str:
+    """
+    Stream the CSV into one .npy file per cacheable column. Memory is
+    bounded by the chunk size. Returns the column directory.
+    """
+    column_dir = column_cache_dir(path, cache_dir)
+    if os.path.exists(os.path.join(column_dir, 'done')):
+        return column_dir
+
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [column for column in cacheable_columns() if column in header]
+    os.makedirs(column_dir, exist_ok=True)
+    files = {column: open(os.path.join(column_dir, f'{column}.npy'), 'wb') for column in columns}
+    n_rows = 0
+    try:
+        for f in files.values():
+            f.write(b'\0' * NPY_HEADER_SIZE)
+        for chunk in iter_chunks(path, columns, chunksize):
+            for column, f in files.items():
+                values = chunk[column]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.cat.codes
+                f.write(np.ascontiguousarray(values.to_numpy(), dtype=_storage_dtype(column)).tobytes())
+            n_rows += len(chunk)
+        for column, f in files.items():
+            f.seek(0)
+            f.write(_npy_header(_storage_dtype(column), n_rows))
+    finally:
+        for f in files.values():
+            f.close()
+
+    with open(os.path.join(column_dir, 'columns.json'), 'w', encoding='utf-8') as f:
+        json.dump({'rows': n_rows, 'columns': columns}, f)
+    open(os.path.join(column_dir, 'done'), 'w').close()
+    return column_dir
+
+
+def load_frame(path: str, columns: list = None, cache_dir: str = None, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Typed DataFrame of the requested columns. With a cache_dir, the columns
+    are memory-mapped from the columnar cache (built on first use) and are
+    read-only; without one, or if a string column is requested, the CSV
+    is read in chunks.
+    """
+    columns = list(columns or cacheable_columns())
+    if cache_dir is None or not set(columns) <= set(cacheable_columns()):
+        return read_typed_csv(path, columns, chunksize)
+
+    column_dir = build_column_cache(path, cache_dir, chunksize)
+    data = {}
+    for column in columns:
+        values = np.load(os.path.join(column_dir, f'{column}.npy'), mmap_mode='r')
+        if isinstance(SCHEMA[column], list):
+            values = pd.Categorical.from_codes(values, dtype=pandas_dtype(column), validate=False)
+        data[column] = values
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from utils.chunking import DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TOKENS, chunk_text, count_tokens
+from utils.employee_store import employee_store
+
+# Text documents in the chatbot knowledge base: (path, source name)
+KNOWLEDGE_FILES = [
+    ('./data/company_policies.txt', 'company_policies.txt'),
+    ('./data/churn_insights.txt', 'churn_insights.txt'),
+]
+
+
+def build_employee_documents(df: pd.DataFrame) -> list:
+    """Summarize the employee data into overall, per-department and high-risk documents"""
+    documents = []
+
+    # Overall stats
+    total_employees = len(df)
+    high_risk = len(df[df['status'] == 'High Risk'])
+    medium_risk = len(df[df['status'] == 'Medium Risk'])
+    low_risk = len(df[df['status'] == 'Low Risk'])
+    avg_churn = df['churn_probability'].mean()
+
+    documents.append({
+        'content': f"""Employee Statistics:
+Total Employees: {total_employees}
+High Risk: {high_risk} ({high_risk/total_employees*100:.1f}%)
+Medium Risk: {medium_risk} ({medium_risk/total_employees*100:.1f}%)
+Low Risk: {low_risk} ({low_risk/total_employees*100:.1f}%)
+Average Churn Probability: {avg_churn:.1%}""",
+        'source': 'employees.csv'
+    })
+
+    # Department stats
+    dept_stats = df.groupby('department').agg({
+        'churn_probability': 'mean',
+        'employee_id': 'count',
+        'satisfaction_level': 'mean'
+    }).round(3)
+
+    for dept in dept_stats.index:
+        documents.append({
+            'content': f"""Department: {dept}
+Employees: {dept_stats.loc[dept, 'employee_id']}
+Average Churn Risk: {dept_stats.loc[dept, 'churn_probability']:.1%}
+Average Satisfaction: {dept_stats.loc[dept, 'satisfaction_level']:.1%}""",
+            'source': 'employees.csv'
+        })
+
+    # High risk employees
+    high_risk_df = df[df['status'] == 'High Risk'].head(10)
+    if len(high_risk_df) > 0:
+        high_risk_list = ', '.join(high_risk_df['employee_id'].tolist())
+        documents.append({
+            'content': f"High Risk Employees (sample): {high_risk_list}",
+            'source': 'employees.csv'
+        })
+
+    for doc in documents:
+        doc['tokens'] = count_tokens(doc['content'])
+    return documents
+
+
+def build_employee_record(row: pd.Series) -> dict:
+    """Document describing a single employee, for questions that name an employee id"""
+    content = f"""Employee {row['employee_id']} ({row['name']})
+Department: {row['department']}
+Status: {row['status']}
+Churn Probability: {row['churn_probability']:.1%}
+Satisfaction: {row['satisfaction_level']:.1%}
+Performance Score: {row['performance_score']}
+Tenure: {row['tenure']} months
+Monthly Salary: {row['monthly_salary']}
+Projects: {row['number_project']}, Average Monthly Hours: {row['average_monthly_hours']}
+Promoted in Last 5 Years: {'Yes' if row['promotion_last_5years'] else 'No'}"""
+    return {
+        'content': content,
+        'source': 'employees.csv',
+        'tokens': count_tokens(content),
+    }
+
+
+class KnowledgeBase:
+    """One assembled version of the knowledge base"""
+
+    def __init__(self, documents: list):
+        self.documents = documents
+        digest = hashlib.sha256()
+        for doc in documents:
+            digest.update(doc['source'].encode('utf-8') + b'\0' + doc['content'].encode('utf-8') + b'\0')
+        # Changes whenever any document changes; used to invalidate derived caches
+        self.content_hash = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.documents)
+
+
+class KnowledgeBaseCache:
+    """
+    Process-wide cache of the assembled knowledge base.
+
+    Each text file is re-read and re-chunked only when its mtime or size
+    changes, and the employee-statistics documents are rebuilt only when
+    the shared employee snapshot is reloaded (i.e. when employees.csv
+    changes).
+    """
+
+    def __init__(self, files=KNOWLEDGE_FILES, store=employee_store,
+                 chunk_tokens: int = DEFAULT_CHUNK_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS):
+        self.files = files
+        self.store = store
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self._file_docs = {}  # path -> ((mtime_ns, size), documents)
+        self._employee_docs = (None, [])  # (snapshot, documents)
+        self._knowledge_base = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _file_documents(self, path: str, source: str, stat) -> list:
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_docs.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            documents = chunk_text(f.read(), source, self.chunk_tokens, self.overlap_tokens)
+        self._file_docs[path] = (version, documents)
+        return documents
+
+    def get(self) -> KnowledgeBase:
+        """Return the current knowledge base, rebuilding only what changed"""
+        stats = []
+        for path, _ in self.files:
+            try:
+                stats.append(os.stat(path))
+            except OSError:
+                stats.append(None)
+        try:
+            snapshot = self.store.get()
+        except Exception:
+            snapshot = None
+
+        key = tuple((s.st_mtime_ns, s.st_size) if s else None for s in stats) + (id(snapshot),)
+        knowledge_base = self._knowledge_base
+        if knowledge_base is not None and key == self._key:
+            return knowledge_base
+
+        with self._lock:
+            if self._knowledge_base is not None and key == self._key:
+                return self._knowledge_base
+
+            documents = []
+            for (path, source), stat in zip(self.files, stats):
+                if stat is None:
+                    continue
+                try:
+                    documents.extend(self._file_documents(path, source, stat))
+                except OSError:
+                    pass
+
+            if snapshot is not None:
+                if self._employee_docs[0] is not snapshot:
+                    try:
+                        self._employee_docs = (snapshot, build_employee_documents(snapshot.df))
+                    except Exception:
+                        self._employee_docs = (snapshot, [])
+                documents.extend(self._employee_docs[1])
+
+            self._knowledge_base = KnowledgeBase(documents)
+            self._key = key
+            return self._knowledge_base
+
+
+knowledge_base_cache = KnowledgeBaseCache()
@@ -0,0 +1,211 @@
+"""
+LLM clients used by the chatbot.
+
+`chat` only depends on the LLMClient interface (an async `generate`), so
+the Gemini backend can be swapped for StubLLMClient to run the endpoint
+offline or in tests. Select the backend with LLM_BACKEND=gemini|stub.
+"""
+import asyncio
+import os
+import time
+
+import google.generativeai as genai
+
+GEMINI_MODEL_NAMES = ['gemini-2.0-flash-exp', 'gemini-1.5-flash-latest', 'gemini-1.5-flash', 'gemini-pro']
+DEFAULT_TIMEOUT = 30.0
+RESOLUTION_TTL = 600.0  # seconds before higher-priority models are re-probed
+FAILURE_THRESHOLD = 3  # consecutive failures that open a model's circuit
+COOLDOWN = 60.0  # seconds an open circuit skips the model
+
+
+class LLMError(Exception):
+    """Raised when no backend could produce a response"""
+
+
+class LLMClient:
+    """Interface: turn a prompt into response text"""
+
+    async def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str):
+        """Yield the response in pieces as it is generated (default: all at once)"""
+        yield await self.generate(prompt)
+
+
+async def _next_chunk(chunks):
+    """Next item of an async iterator, or None when it is exhausted"""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class ModelResolver:
+    """
+    Remembers which model in a priority list last worked.
+
+    While the resolution is fresh (`ttl` seconds) the remembered model is
+    tried first, so an unavailable higher-priority model costs nothing per
+    message; once it expires the full priority order is probed again. A
+    model that fails `failure_threshold` times in a row is skipped for
+    `cooldown` seconds (circuit open), then given one trial call.
+    """
+
+    def __init__(self, model_names, ttl: float = RESOLUTION_TTL,
+                 failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN,
+                 clock=time.monotonic):
+        self.model_names = list(model_names)
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.resolved = None
+        self.resolved_at = 0.0
+        self._failures = {}  # model name -> consecutive failures
+        self._open_until = {}  # model name -> time its circuit closes
+
+    def is_open(self, model_name: str) -> bool:
+        return self._open_until.get(model_name, 0.0) > self.clock()
+
+    def candidates(self) -> list:
+        """Model names to try for the next call, in order"""
+        order = self.model_names
+        if self.resolved is not None and self.clock() - self.resolved_at < self.ttl:
+            order = [self.resolved] + [name for name in order if name != self.resolved]
+        return [name for name in order if not self.is_open(name)]
+
+    def record_success(self, model_name: str):
+        if model_name != self.resolved or self.clock() - self.resolved_at >= self.ttl:
+            self.resolved_at = self.clock()
+        self.resolved = model_name
+        self._failures.pop(model_name, None)
+        self._open_until.pop(model_name, None)
+
+    def record_failure(self, model_name: str):
+        failures = self._failures.get(model_name, 0) + 1
+        self._failures[model_name] = failures
+        if failures >= self.failure_threshold:
+            self._open_until[model_name] = self.clock() + self.cooldown
+        if model_name == self.resolved:
+            self.resolved = None
+
+
+class GeminiClient(LLMClient):
+    """
+    Gemini over the async API. Each call is bounded by `timeout` seconds;
+    on failure the next candidate from the ModelResolver is tried.
+    GenerativeModel objects are created once per model name and reused.
+    `model_factory` can be replaced by a fake for tests.
+    """
+
+    def __init__(self, api_key: str = None, model_names=GEMINI_MODEL_NAMES, timeout: float = DEFAULT_TIMEOUT,
+                 resolver: ModelResolver = None, model_factory=None):
+        if api_key:
+            genai.configure(api_key=api_key)
+        self.timeout = timeout
+        self.resolver = resolver or ModelResolver(model_names)
+        self.model_factory = model_factory or genai.GenerativeModel
+        self._models = {}
+
+    def get_model(self, model_name: str):
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self.model_factory(model_name)
+        return model
+
+    async def _generate_with(self, model_name: str, prompt: str) -> str:
+        model = self.get_model(model_name)
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, request_options={'timeout': self.timeout}),
+            timeout=self.timeout,
+        )
+        return response.text
+
+    async def generate(self, prompt: str) -> str:
+        candidates = self.resolver.candidates()
+        if not candidates:
+            raise LLMError("All Gemini models are temporarily unavailable")
+        for model_name in candidates:
+            try:
+                text = await self._generate_with(model_name, prompt)
+            except Exception:
+                self.resolver.record_failure(model_name)
+                continue
+            self.resolver.record_success(model_name)
+            return text
+        raise LLMError("No available Gemini model found")
+
+    async def stream(self, prompt: str):
+        """
+        Stream response text. Falls back to the next model only until the
+        first chunk arrives; each chunk must arrive within `timeout`.
+        """
+        candidates = self.resolver.candidates()
+        if not candidates:
+            raise LLMError("All Gemini models are temporarily unavailable")
+        for model_name in candidates:
+            try:
+                response = await asyncio.wait_for(
+                    self.get_model(model_name).generate_content_async(
+                        prompt, stream=True, request_options={'timeout': self.timeout}
+                    ),
+                    timeout=self.timeout,
+                )
+                chunks = response.__aiter__()
+                chunk = await asyncio.wait_for(_next_chunk(chunks), timeout=self.timeout)
+            except Exception:
+                self.resolver.record_failure(model_name)
+                continue
+            self.resolver.record_success(model_name)
+
+            while chunk is not None:
+                yield chunk.text
+                chunk = await asyncio.wait_for(_next_chunk(chunks), timeout=self.timeout)
+            return
+        raise LLMError("No available Gemini model found")
+
+
+class StubLLMClient(LLMClient):
+    """
+    Local stand-in that answers without any network call. `stream` yields
+    the answer word by word, `delay` seconds apart, like a streaming LLM.
+    """
+
+    def __init__(self, response: str = None, delay: float = 0.0):
+        self.response = response
+        self.delay = delay
+        self.prompts = []
+
+    def _answer(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if self.response is not None:
+            return self.response
+        question = prompt.split('User Question:', 1)[-1].split('\n', 1)[0].strip()
+        return f"[stub] {question}"
+
+    async def generate(self, prompt: str) -> str:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._answer(prompt)
+
+    async def stream(self, prompt: str):
+        words = self._answer(prompt).split(' ')
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield word if i == 0 else ' ' + word
+
+
+def make_llm_client(backend: str = None, api_key: str = None) -> LLMClient:
+    """
+    Build the configured client. Returns None for the Gemini backend when
+    no API key is set, so the caller can report the missing configuration.
+    """
+    backend = backend or os.getenv("LLM_BACKEND", "gemini")
+    timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT))
+    if backend == 'stub':
+        return StubLLMClient()
+    if backend == 'gemini':
+        return GeminiClient(api_key, timeout=timeout) if api_key else None
+    raise ValueError(f"Unknown LLM backend {backend!r}; expected 'gemini' or 'stub'")
@@ -0,0 +1,167 @@
+"""
+Single-file, memory-mappable format for the fused churn model.
+
+Layout:
+    MAGIC (8 bytes) | header length (uint32, little-endian) | JSON header | padding | array data
+
+The JSON header carries the schema name, format version, model metadata
+(feature names, categories, classes, scaler stats) and, for each node
+array, its dtype, shape and byte offset. Arrays are 64-byte aligned and
+loaded with np.frombuffer over a read-only mmap, so every worker shares
+the same physical pages through the OS page cache and loading does not
+execute any pickled code. Offline bulk scoring can ask for the pickled
+sklearn forest saved alongside, unpickled on its first large batch (see
+load_artifact).
+"""
+import functools
+import json
+import mmap
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from utils.forest_engine import CompiledForest
+from utils.fused_model import FusedModel
+
+MAGIC = b'CHURNFM\x00'
+SCHEMA = 'fused-random-forest'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# CompiledForest arrays stored in the file, with their on-disk dtypes
+ARRAY_DTYPES = {
+    'feature': '<i8',
+    'threshold': '<f8',
+    'children': '<i8',
+    'value': '<f8',
+    'roots': '<i8',
+    'missing_left': '|b1',
+}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_artifact(model: FusedModel, path: str):
+    """Write a FusedModel as a versioned, mmap-able artifact"""
+    forest = model.forest
+    arrays = {name: np.ascontiguousarray(getattr(forest, name), dtype=dtype)
+              for name, dtype in ARRAY_DTYPES.items()}
+
+    header = {
+        'schema': SCHEMA,
+        'version': FORMAT_VERSION,
+        'feature_names': model.feature_names,
+        'categories': model.categories,
+        'classes': forest.classes_.tolist(),
+        'max_depth': int(forest.max_depth),
+        'float32_inputs': bool(forest.float32_inputs),
+        'scaler_mean': model.scaler_mean.tolist(),
+        'scaler_scale': model.scaler_scale.tolist(),
+        'arrays': {},
+    }
+
+    # Offsets are relative to the start of the data section
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        header['arrays'][name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+        }
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    # Serving workers memory-map the live file: truncating it in place would
+    # SIGBUS them, so write a new file and swap it in atomically
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\x00' * (data_start + header['arrays'][name]['offset'] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_forest_pickle(path: str, compiled: CompiledForest):
+    """
+    Unpickle the sklearn forest saved next to an artifact, checking that
+    it is the forest the artifact was compiled from.
+    """
+    with open(path, 'rb') as f:
+        forest = pickle.load(f)
+    n_nodes = sum(estimator.tree_.node_count for estimator in forest.estimators_)
+    if (len(forest.estimators_) != compiled.n_estimators or n_nodes != compiled.n_nodes
+            or forest.classes_.tolist() != compiled.classes_.tolist()):
+        raise ValueError(f"{path} does not match the compiled model artifact")
+    return forest
+
+
+def load_artifact(path: str, fallback_path: str = None) -> FusedModel:
+    """
+    Memory-map an artifact written by save_artifact. Raises ValueError if
+    the file is not a fused-model artifact of a supported version.
+
+    If `fallback_path` names the pickled sklearn forest written with the
+    artifact, it is loaded on the first batch of FALLBACK_MIN_ROWS or
+    more and used for large batches; nothing is unpickled until then.
+    The API leaves it out: each worker would hold a private copy.
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a churn model artifact")
+    (header_len,) = struct.unpack_from('<I', buffer, len(MAGIC))
+    header_end = len(MAGIC) + 4 + header_len
+    header = json.loads(bytes(buffer[len(MAGIC) + 4:header_end]).decode('utf-8'))
+
+    if header.get('schema') != SCHEMA:
+        raise ValueError(f"Unsupported model schema {header.get('schema')!r} in {path}")
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model artifact version {header.get('version')} in {path} "
+            f"(expected {FORMAT_VERSION}); retrain the model to regenerate it"
+        )
+
+    data_start = _align(header_end)
+    arrays = {}
+    for name, dtype in ARRAY_DTYPES.items():
+        spec = header['arrays'][name]
+        if np.dtype(spec['dtype']) != np.dtype(dtype):
+            raise ValueError(f"Unexpected dtype {spec['dtype']} for {name} in {path}")
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        end = data_start + spec['offset'] + count * np.dtype(dtype).itemsize
+        if end > len(buffer):
+            raise ValueError(f"Model artifact {path} is truncated")
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec['offset']
+        ).reshape(spec['shape'])
+
+    forest = CompiledForest(
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        children=arrays['children'],
+        value=arrays['value'],
+        roots=arrays['roots'],
+        classes=np.asarray(header['classes']),
+        max_depth=header['max_depth'],
+        missing_left=arrays['missing_left'],
+        float32_inputs=header['float32_inputs'],
+    )
+    fallback_loader = None
+    if fallback_path is not None and os.path.exists(fallback_path):
+        fallback_loader = functools.partial(load_forest_pickle, fallback_path, forest)
+    return FusedModel(
+        forest, header['feature_names'], header['categories'],
+        header['scaler_mean'], header['scaler_scale'],
+        fallback_loader=fallback_loader
+    )
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.vector_index import BruteForceIndex
+
+
+class SemanticResponseCache:
+    """
+    LRU/TTL cache of chatbot responses keyed by query embedding.
+
+    A lookup hits when a stored query is at least `threshold` cosine-similar
+    to the new one, so rephrasings of the same question are answered
+    without an LLM call. Entries belong to one knowledge-base content hash
+    and are all dropped as soon as a different hash is seen. With
+    max_entries <= 0 the cache is disabled: get always misses and put
+    stores nothing.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0, threshold: float = 0.95,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._content_hash = None
+        self._entries = OrderedDict()  # id -> (created_at, response), oldest first
+        self._index = BruteForceIndex()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _reset(self, content_hash: str):
+        self._content_hash = content_hash
+        self._entries.clear()
+        self._index = BruteForceIndex()
+
+    def _evict(self, entry_id: int):
+        del self._entries[entry_id]
+        self._index.remove([entry_id])
+
+    def get(self, query_embedding, content_hash: str):
+        """Return the cached response for a near-duplicate query, or None"""
+        with self._lock:
+            if not self.enabled:
+                self.misses += 1
+                return None
+            if content_hash != self._content_hash:
+                self._reset(content_hash)
+
+            ids, scores = self._index.search(np.asarray(query_embedding, dtype=np.float32), 1)
+            if len(ids) and scores[0] >= self.threshold:
+                entry_id = int(ids[0])
+                created_at, response = self._entries[entry_id]
+                if self.clock() - created_at < self.ttl:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return response
+                self._evict(entry_id)
+
+            self.misses += 1
+            return None
+
+    def put(self, query_embedding, content_hash: str, response):
+        with self._lock:
+            if not self.enabled:
+                return
+            if content_hash != self._content_hash:
+                self._reset(content_hash)
+            while len(self._entries) >= self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (self.clock(), response)
+            self._index.add([entry_id], np.asarray(query_embedding, dtype=np.float32)[None, :])
+
+    def clear(self):
+        with self._lock:
+            self._reset(self._content_hash)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
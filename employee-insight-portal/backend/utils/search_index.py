@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+class SubstringIndex:
+    """
+    Case-insensitive substring index over one or more text columns.
+
+    Every 1-, 2- and 3-character gram of each row maps to the sorted row
+    positions containing it. A query of up to 3 characters is answered by
+    a single posting list; longer queries intersect the posting lists of
+    their trigrams and then verify the (few) surviving candidates.
+    """
+
+    def __init__(self, *columns, gram_size: int = 3):
+        self.gram_size = gram_size
+        self.texts = [[str(value).lower() for value in column] for column in columns]
+        self.postings = self._build_postings()
+
+    def _build_postings(self) -> dict:
+        postings = defaultdict(list)
+        for position, fields in enumerate(zip(*self.texts)):
+            grams = set()
+            for text in fields:
+                for size in range(1, self.gram_size + 1):
+                    grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+            for gram in grams:
+                postings[gram].append(position)
+        return {gram: np.asarray(positions) for gram, positions in postings.items()}
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted row positions whose text contains the query (literal match)"""
+        query = query.lower()
+        empty = np.empty(0, dtype=np.intp)
+
+        if len(query) <= self.gram_size:
+            return self.postings.get(query, empty)
+
+        # Intersect trigram posting lists, smallest first
+        grams = {query[i:i + self.gram_size] for i in range(len(query) - self.gram_size + 1)}
+        lists = sorted((self.postings.get(gram, empty) for gram in grams), key=len)
+        candidates = lists[0]
+        for positions in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+
+        # Trigrams can co-occur without the full query being present
+        return np.asarray(
+            [p for p in candidates if any(query in texts[p] for texts in self.texts)],
+            dtype=np.intp,
+        )
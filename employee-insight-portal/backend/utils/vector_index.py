@@ -0,0 +1,236 @@
+"""
+Inner-product vector indexes for RAG retrieval (pure NumPy).
+
+Vectors are expected to be unit length, so inner product is cosine
+similarity. Every index supports incremental add/remove by integer id and
+returns the top-k (ids, scores) with the best match first.
+
+- BruteForceIndex: exact; one matrix-vector product per query.
+- IVFIndex: approximate; vectors are bucketed by a spherical k-means
+  coarse quantizer and a query only scans the `n_probe` closest buckets.
+"""
+import numpy as np
+
+# Rows scored against the centroids at once, so assigning n vectors needs
+# a (block x n_lists) similarity matrix instead of (n x n_lists)
+ASSIGN_BLOCK_ROWS = 4096
+
+
+def nearest_centroid(vectors: np.ndarray, centroids: np.ndarray, block_rows: int = ASSIGN_BLOCK_ROWS) -> np.ndarray:
+    """Index of the most similar centroid for every vector, computed block by block"""
+    assignment = np.empty(len(vectors), dtype=np.intp)
+    for start in range(0, len(vectors), block_rows):
+        block = vectors[start:start + block_rows]
+        assignment[start:start + block_rows] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first (argpartition + small sort)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+class VectorIndex:
+    """Interface shared by the retrieval backends"""
+
+    def add(self, ids, vectors):
+        raise NotImplementedError
+
+    def remove(self, ids):
+        raise NotImplementedError
+
+    def search(self, query, k: int):
+        """Return (ids, scores) of the k best matches for one query vector"""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class BruteForceIndex(VectorIndex):
+    """Exact search over a dense, growable matrix"""
+
+    def __init__(self, dim: int = None):
+        self.dim = dim
+        self._vectors = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._slots = {}  # id -> row
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, n: int):
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 16)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+        self._vectors, self._ids = vectors, ids
+
+    def add(self, ids, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        self.remove([i for i in ids if i in self._slots])
+        self._reserve(self._size + len(ids))
+        start = self._size
+        self._vectors[start:start + len(ids)] = vectors
+        self._ids[start:start + len(ids)] = ids
+        for offset, doc_id in enumerate(ids):
+            self._slots[int(doc_id)] = start + offset
+        self._size += len(ids)
+
+    def remove(self, ids):
+        for doc_id in ids:
+            slot = self._slots.pop(int(doc_id), None)
+            if slot is None:
+                continue
+            # Move the last row into the hole
+            last = self._size - 1
+            if slot != last:
+                self._vectors[slot] = self._vectors[last]
+                self._ids[slot] = self._ids[last]
+                self._slots[int(self._ids[slot])] = slot
+            self._size -= 1
+
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size] if self._size else np.empty((0, self.dim or 0), np.float32)
+
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    def search(self, query, k: int):
+        if not self._size:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.vectors() @ np.asarray(query, dtype=np.float32)
+        best = top_k(scores, k)
+        return self._ids[best], scores[best]
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors live in `n_lists` buckets around k-means
+    centroids, and a query scans only the `n_probe` most similar buckets.
+
+    Until `train_size` vectors have been added the index behaves like a
+    BruteForceIndex; it then trains the quantizer on what it holds and
+    redistributes. Later adds and removes only touch one bucket each.
+    """
+
+    def __init__(self, n_lists: int = 256, n_probe: int = 8, train_size: int = None,
+                 n_iter: int = 10, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size or 32 * n_lists
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self._lists = []
+        self._owner = {}  # id -> bucket
+        self._pending = BruteForceIndex()
+
+    def __len__(self):
+        if self.centroids is None:
+            return len(self._pending)
+        return len(self._owner)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors):
+        """Fit the coarse quantizer with spherical k-means"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        n_lists = min(self.n_lists, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignment = nearest_centroid(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0.0
+            # Re-seed empty buckets so no centroid is wasted
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = sums / norms
+
+        self.centroids = centroids.astype(np.float32)
+        self._lists = [BruteForceIndex(vectors.shape[1]) for _ in range(len(self.centroids))]
+
+    def _assign(self, vectors) -> np.ndarray:
+        return nearest_centroid(vectors, self.centroids)
+
+    def add(self, ids, vectors):
+        ids = [int(i) for i in ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+
+        if self.centroids is None:
+            self._pending.add(ids, vectors)
+            if len(self._pending) < self.train_size:
+                return
+            pending_ids, pending_vectors = self._pending.ids().copy(), self._pending.vectors().copy()
+            self._pending = BruteForceIndex()
+            self.train(pending_vectors)
+            ids, vectors = pending_ids.tolist(), pending_vectors
+
+        self.remove([i for i in ids if i in self._owner])
+        assignment = self._assign(vectors)
+        for bucket in np.unique(assignment):
+            members = np.flatnonzero(assignment == bucket)
+            bucket_ids = [ids[m] for m in members]
+            self._lists[bucket].add(bucket_ids, vectors[members])
+            for doc_id in bucket_ids:
+                self._owner[doc_id] = int(bucket)
+
+    def remove(self, ids):
+        if self.centroids is None:
+            self._pending.remove(ids)
+            return
+        for doc_id in ids:
+            bucket = self._owner.pop(int(doc_id), None)
+            if bucket is not None:
+                self._lists[bucket].remove([doc_id])
+
+    def search(self, query, k: int):
+        query = np.asarray(query, dtype=np.float32)
+        if self.centroids is None:
+            return self._pending.search(query, k)
+
+        found_ids, found_scores = [], []
+        for bucket in top_k(self.centroids @ query, self.n_probe):
+            ids, scores = self._lists[bucket].search(query, k)
+            found_ids.append(ids)
+            found_scores.append(scores)
+
+        ids = np.concatenate(found_ids)
+        scores = np.concatenate(found_scores)
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+
+INDEX_BACKENDS = {
+    'bruteforce': BruteForceIndex,
+    'ivf': IVFIndex,
+}
+
+
+def make_index(backend: str = 'bruteforce', **options) -> VectorIndex:
+    """Create a retrieval index by backend name ('bruteforce' or 'ivf')"""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index backend {backend!r}; expected one of {list(INDEX_BACKENDS)}")
+    return INDEX_BACKENDS[backend](**options)
@@ -1,5 +1,4 @@
 import React, { useState, useRef, useEffect } from 'react';
-import axios from 'axios';
 
 const API_URL = 'http://localhost:8000';
 
@@ -35,16 +34,56 @@ function Chatbot() {
     setLoading(true);
 
     try {
-      const response = await axios.post(`${API_URL}/chat`, {
-        message: userMessage
+      // Stream the answer: sources arrive first, then tokens as they are generated
+      const response = await fetch(`${API_URL}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message: userMessage })
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP ${response.status}`);
+      }
 
-      // Add assistant response
-      setMessages(prev => [...prev, {
-        role: 'assistant',
-        content: response.data.response,
-        sources: response.data.sources || []
-      }]);
+      const updateAssistant = (update) => {
+        setMessages(prev => {
+          const next = [...prev];
+          next[next.length - 1] = update(next[next.length - 1]);
+          return next;
+        });
+      };
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let started = false;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-Sent Events are separated by a blank line
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || 'null');
+
+          if (event === 'sources') {
+            started = true;
+            setMessages(prev => [...prev, { role: 'assistant', content: '', sources: data || [] }]);
+          } else if (event === 'token') {
+            updateAssistant(message => ({ ...message, content: message.content + data.text }));
+          } else if (event === 'error') {
+            if (!started) throw new Error(data.message);
+            updateAssistant(message => ({
+              ...message,
+              content: message.content ? `${message.content}\n\n${data.message}` : data.message
+            }));
+          }
+        }
+      }
     } catch (error) {
       console.error('Chat error:', error);
       setMessages(prev => [...prev, {
@@ -129,7 +168,8 @@ function Chatbot() {
             </div>
           ))}
           
-          {loading && (
+          {/* Typing indicator until the streamed answer starts */}
+          {loading && messages[messages.length - 1].role === 'user' && (
             <div className="flex justify-start">
               <div className="flex-shrink-0 mr-3">
                 <div className="w-8 h-8 rounded-full bg-gray-300 flex items-center justify-center">
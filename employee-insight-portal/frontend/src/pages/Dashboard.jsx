@@ -5,7 +5,7 @@ import { BarChart, Bar, LineChart, Line, PieChart, Pie, Cell, XAxis, YAxis, Cart
 const API_URL = 'http://localhost:8000';
 
 function Dashboard() {
-  const [employees, setEmployees] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -14,8 +14,8 @@ function Dashboard() {
 
   const fetchData = async () => {
     try {
-      const response = await axios.get(`${API_URL}/employees?limit=1000`);
-      setEmployees(response.data.employees);
+      const response = await axios.get(`${API_URL}/employees/stats`);
+      setStats(response.data);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
@@ -34,62 +34,37 @@ function Dashboard() {
     );
   }
 
-  // Calculate KPIs
-  const totalEmployees = employees.length;
-  const avgChurnProb = employees.reduce((sum, emp) => sum + emp.churn_probability, 0) / totalEmployees;
-  const highRiskCount = employees.filter(emp => emp.status === 'High Risk').length;
-  const avgSatisfaction = employees.reduce((sum, emp) => sum + emp.satisfaction_level, 0) / totalEmployees;
+  if (!stats) {
+    return (
+      <div className="flex items-center justify-center h-64">
+        <p className="text-gray-600">Unable to load dashboard data.</p>
+      </div>
+    );
+  }
 
-  // Department-wise data
-  const deptData = employees.reduce((acc, emp) => {
-    if (!acc[emp.department]) {
-      acc[emp.department] = { department: emp.department, count: 0, avgRisk: 0, totalRisk: 0 };
-    }
-    acc[emp.department].count++;
-    acc[emp.department].totalRisk += emp.churn_probability;
-    return acc;
-  }, {});
+  // KPIs (aggregated server-side)
+  const totalEmployees = stats.total_employees;
+  const avgChurnProb = stats.avg_churn_probability;
+  const highRiskCount = stats.status_counts['High Risk'] || 0;
+  const avgSatisfaction = stats.avg_satisfaction;
 
-  const departmentChartData = Object.values(deptData).map(dept => ({
+  // Department-wise data
+  const departmentChartData = stats.departments.map(dept => ({
     department: dept.department,
-    avgRisk: ((dept.totalRisk / dept.count) * 100).toFixed(1),
-    employees: dept.count
+    avgRisk: (dept.avg_churn_probability * 100).toFixed(1),
+    employees: dept.employees
   }));
 
   // Risk distribution
-  const riskDistribution = [
-    { name: 'Low Risk', value: employees.filter(e => e.status === 'Low Risk').length },
-    { name: 'Medium Risk', value: employees.filter(e => e.status === 'Medium Risk').length },
-    { name: 'High Risk', value: employees.filter(e => e.status === 'High Risk').length }
-  ];
+  const riskDistribution = ['Low Risk', 'Medium Risk', 'High Risk'].map(name => ({
+    name,
+    value: stats.status_counts[name] || 0
+  }));
 
   // Tenure vs Churn
-  const tenureGroups = {
-    '0-12': { tenure: '0-12 months', count: 0, totalRisk: 0 },
-    '13-24': { tenure: '13-24 months', count: 0, totalRisk: 0 },
-    '25-36': { tenure: '25-36 months', count: 0, totalRisk: 0 },
-    '37+': { tenure: '37+ months', count: 0, totalRisk: 0 }
-  };
-
-  employees.forEach(emp => {
-    if (emp.tenure <= 12) {
-      tenureGroups['0-12'].count++;
-      tenureGroups['0-12'].totalRisk += emp.churn_probability;
-    } else if (emp.tenure <= 24) {
-      tenureGroups['13-24'].count++;
-      tenureGroups['13-24'].totalRisk += emp.churn_probability;
-    } else if (emp.tenure <= 36) {
-      tenureGroups['25-36'].count++;
-      tenureGroups['25-36'].totalRisk += emp.churn_probability;
-    } else {
-      tenureGroups['37+'].count++;
-      tenureGroups['37+'].totalRisk += emp.churn_probability;
-    }
-  });
-
-  const tenureChartData = Object.values(tenureGroups).map(group => ({
+  const tenureChartData = stats.tenure_groups.map(group => ({
     tenure: group.tenure,
-    avgRisk: group.count > 0 ? ((group.totalRisk / group.count) * 100).toFixed(1) : 0
+    avgRisk: group.employees > 0 ? (group.avg_churn_probability * 100).toFixed(1) : 0
   }));
 
   const COLORS = ['#6b8e4e', '#f59e0b', '#ef4444'];
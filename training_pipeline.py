@@ -0,0 +1,509 @@
+"""
+Churn model training pipeline shared by all training entry points.
+
+Loads and cleans data.csv, encodes and caches the feature matrix, fits the
+RandomForest on all cores and writes the artifacts the API serves to
+employee-insight-portal/backend/models/.
+
+Usage:
+    python training_pipeline.py                          # 'balanced' preset (the deployed model)
+    python training_pipeline.py --preset smote           # SMOTE-resampled variant
+    python training_pipeline.py --config my_config.json  # preset + overrides from a JSON file
+    python training_pipeline.py --set n_estimators=300 --set max_depth=12 --no-cache
+    python training_pipeline.py --data big_export.csv --streaming --chunk-rows 250000
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from dataclasses import asdict, dataclass, field, fields, replace
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'employee-insight-portal', 'backend')
+
+# Fused inference model and typed CSV ingestion shared with the API
+sys.path.insert(0, BACKEND_DIR)
+from utils.fused_model import fuse_model
+from utils.ingest import SCHEMA, load_frame
+from utils.model_artifact import save_artifact
+
+# Directory the API loads its model from, and the feature set it serves
+API_MODELS_DIR = os.path.join(BACKEND_DIR, 'models')
+FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges', 'Contract', 'InternetService']
+TARGET = 'Churn'
+# Keys of the label encoders in label_encoders_<suffix>.pkl, as the API expects them
+ENCODER_KEYS = {'Contract': 'contract', 'InternetService': 'internet'}
+# Bump when cleaning/encoding changes so stale dataset caches are ignored
+DATASET_CACHE_VERSION = 3
+# Streaming mode: rows per shuffled block, and the sample size for the TotalCharges median
+STREAM_BLOCK_ROWS = 4096
+STREAM_MEDIAN_SAMPLE = 1_000_000
+# Config fields holding paths; relative values are resolved against ROOT_DIR
+PATH_FIELDS = ('data_path', 'output_dir', 'cache_dir')
+
+
+@dataclass
+class TrainingConfig:
+    data_path: str = os.path.join(ROOT_DIR, 'data.csv')
+    features: list = field(default_factory=lambda: list(FEATURES))
+    target: str = TARGET
+    missing_total_charges: str = 'median'  # 'median' fill or 'drop' the rows
+    test_size: float = 0.2
+    random_state: int = 42
+    smote: bool = False
+    model_params: dict = field(default_factory=dict)
+    n_jobs: int = -1
+    output_dir: str = API_MODELS_DIR
+    model_suffix: str = '5features'
+    cache_dir: str = os.path.join(ROOT_DIR, '.cache', 'training')
+    streaming: bool = False  # fit chunk by chunk from the columnar cache (see fit_streaming)
+    chunk_rows: int = 250_000
+
+    @classmethod
+    def from_dict(cls, values: dict, base: 'TrainingConfig' = None) -> 'TrainingConfig':
+        """
+        Config with `values` applied over `base` (default: the defaults).
+        Relative paths are taken from the repository root, so a config file
+        means the same thing from any working directory.
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Unknown training config keys: {sorted(unknown)}")
+        base = base or cls()
+        values = dict(values)
+        if 'model_params' in values:
+            values['model_params'] = {**base.model_params, **values['model_params']}
+        for name in PATH_FIELDS:
+            if name in values:
+                values[name] = os.path.join(ROOT_DIR, values[name])
+        return replace(base, **values)
+
+
+# Named starting points. 'balanced' reproduces the model the API ships with
+# (formerly train_model_top5_features.py); 'smote' is the SMOTE variant
+# (formerly train_5_features_model.py).
+PRESETS = {
+    'balanced': {
+        'missing_total_charges': 'median',
+        'smote': False,
+        'model_params': {
+            'n_estimators': 100,
+            'max_depth': 10,
+            'min_samples_split': 20,
+            'min_samples_leaf': 10,
+            'class_weight': 'balanced',
+        },
+    },
+    'smote': {
+        'missing_total_charges': 'drop',
+        'smote': True,
+        'model_params': {
+            'n_estimators': 200,
+            'max_depth': 10,
+        },
+    },
+}
+
+
+def preset_config(name: str = 'balanced') -> TrainingConfig:
+    if name not in PRESETS:
+        raise ValueError(f"Unknown preset {name!r}; expected one of {list(PRESETS)}")
+    return TrainingConfig.from_dict(PRESETS[name])
+
+
+@dataclass
+class Dataset:
+    """Cleaned, label-encoded feature matrix and target"""
+    X: np.ndarray
+    y: np.ndarray
+    feature_names: list
+    encoders: dict  # column -> fitted LabelEncoder
+
+
+def _label_encoder(classes) -> LabelEncoder:
+    """Rebuild a fitted LabelEncoder from its (cached) classes"""
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(classes, dtype=object)
+    return encoder
+
+
+def clean_dataset(df: pd.DataFrame, config: TrainingConfig) -> Dataset:
+    """
+    Repair TotalCharges, encode categoricals and the target. Rows with an
+    empty categorical feature are dropped (as in streaming mode) rather
+    than encoded as a 'nan' class.
+    """
+    df = df[config.features + [config.target]].copy()
+    categorical = [column for column in config.features if not pd.api.types.is_numeric_dtype(df[column])]
+    df = df.dropna(subset=categorical)
+
+    if 'TotalCharges' in df:
+        df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+        if config.missing_total_charges == 'drop':
+            df = df.dropna()
+        elif config.missing_total_charges == 'median':
+            df['TotalCharges'] = df['TotalCharges'].fillna(df['TotalCharges'].median())
+        else:
+            raise ValueError(f"missing_total_charges must be 'median' or 'drop', got {config.missing_total_charges!r}")
+
+    encoders = {}
+    for column in categorical:
+        encoder = LabelEncoder()
+        df[column] = encoder.fit_transform(df[column].astype(str))
+        encoders[column] = encoder
+
+    y = df[config.target].map({'Yes': 1, 'No': 0}).to_numpy(dtype=np.int64)
+    X = df[config.features].to_numpy(dtype=np.float64)
+    return Dataset(X, y, list(config.features), encoders)
+
+
+def dataset_cache_path(config: TrainingConfig) -> str:
+    """Cache file for the encoded dataset; changes with the data file and cleaning options"""
+    stat = os.stat(config.data_path)
+    key = json.dumps({
+        'version': DATASET_CACHE_VERSION,
+        'data': [os.path.abspath(config.data_path), stat.st_size, stat.st_mtime_ns],
+        'features': config.features,
+        'target': config.target,
+        'missing_total_charges': config.missing_total_charges,
+    }, sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(config.cache_dir, f'dataset_{digest}.npz')
+
+
+def load_dataset(config: TrainingConfig, use_cache: bool = True) -> Dataset:
+    """Load the cleaned, encoded dataset, from the cache when data.csv is unchanged"""
+    cache_path = dataset_cache_path(config)
+    if use_cache and os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=False) as cached:
+            encoders = {column: _label_encoder(cached[f'classes_{column}'])
+                        for column in config.features if f'classes_{column}' in cached}
+            return Dataset(cached['X'], cached['y'], list(config.features), encoders)
+
+    df = load_frame(config.data_path, config.features + [config.target],
+                    cache_dir=config.cache_dir if use_cache else None)
+    dataset = clean_dataset(df, config)
+
+    if use_cache:
+        os.makedirs(config.cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp.npz'
+        np.savez(tmp_path, X=dataset.X, y=dataset.y,
+                 **{f'classes_{column}': encoder.classes_.astype(str) for column, encoder in dataset.encoders.items()})
+        os.replace(tmp_path, cache_path)
+    return dataset
+
+
+def split_dataset(dataset: Dataset, config: TrainingConfig):
+    return train_test_split(dataset.X, dataset.y, test_size=config.test_size,
+                            random_state=config.random_state, stratify=dataset.y)
+
+
+def fit_model(X_train, y_train, config: TrainingConfig):
+    """Resample (optionally), scale and fit the forest. Returns (model, scaler)"""
+    if config.smote:
+        from imblearn.over_sampling import SMOTE
+        X_train, y_train = SMOTE(random_state=config.random_state).fit_resample(X_train, y_train)
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+
+    model = RandomForestClassifier(random_state=config.random_state, n_jobs=config.n_jobs, **config.model_params)
+    model.fit(X_train, y_train)
+    # Serve single-row predictions without spinning up a worker pool
+    model.set_params(n_jobs=None)
+    return model, scaler
+
+
+def stream_plan(n_rows: int, config: TrainingConfig):
+    """
+    Shuffle the rows in blocks and split the blocks into test rows and
+    training chunks of about config.chunk_rows. Returns (test row
+    indices, list of training chunk row indices); each index array is sorted
+    so a chunk reads the column files front to back.
+    """
+    block_rows = max(1, min(STREAM_BLOCK_ROWS, n_rows // 1000))
+    starts = np.random.default_rng(config.random_state).permutation(np.arange(0, n_rows, block_rows))
+    n_test = int(round(len(starts) * config.test_size))
+
+    def rows(block_starts):
+        return np.sort(np.concatenate([np.arange(b, min(b + block_rows, n_rows)) for b in block_starts]))
+
+    blocks_per_chunk = max(1, config.chunk_rows // block_rows)
+    train = starts[n_test:]
+    chunks = [rows(train[i:i + blocks_per_chunk]) for i in range(0, len(train), blocks_per_chunk)]
+    return rows(starts[:n_test]), chunks
+
+
+def encode_chunk(frame: pd.DataFrame, rows: np.ndarray, config: TrainingConfig, fill_value: float):
+    """
+    Feature matrix and target for some rows of the memory-mapped frame.
+    Categoricals become their schema codes; rows with an empty categorical
+    or target, and rows missing TotalCharges when missing_total_charges is 'drop',
+    are skipped.
+    """
+    columns = []
+    for column in config.features:
+        values = frame[column].take(rows)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy().astype(np.float64)
+            columns.append(np.where(codes < 0, np.nan, codes))
+        else:
+            columns.append(values.to_numpy(dtype=np.float64))
+    X = np.column_stack(columns)
+    y = frame[config.target].take(rows).cat.codes.to_numpy().astype(np.int64)
+
+    if 'TotalCharges' in config.features and config.missing_total_charges == 'median':
+        column = X[:, config.features.index('TotalCharges')]
+        column[np.isnan(column)] = fill_value
+    keep = ~np.isnan(X).any(axis=1) & (y >= 0)
+    return X[keep], y[keep]
+
+
+def fit_streaming(config: TrainingConfig):
+    """
+    Fit the forest without holding the dataset in memory. The CSV is
+    streamed once into the columnar cache; training then reads it through
+    mmap one chunk at a time.
+
+    Pass 1 fits the scaler (partial_fit), counts the classes for
+    class_weight='balanced'. Pass 2 grows
+    the forest with warm_start to exactly n_estimators trees: each chunk
+    adds its share, fitted on that chunk only (SMOTE, if enabled, is
+    applied per chunk). With more chunks than trees, chunks whose share
+    rounds to zero are not used for fitting.
+    Peak memory is one chunk plus the forest; the test split is scored
+    chunk by chunk, keeping only the target and the probability per row.
+
+    Returns (model, scaler, dataset without X/y, y_test, test probabilities, training rows).
+    """
+    for column in config.features + [config.target]:
+        if column not in SCHEMA or SCHEMA[column] == 'str':
+            raise ValueError(f"Streaming training needs schema-typed columns; {column!r} is not one")
+    frame = load_frame(config.data_path, config.features + [config.target], cache_dir=config.cache_dir)
+    test_rows, chunks = stream_plan(len(frame), config)
+
+    fill_value = np.nan
+    if 'TotalCharges' in config.features:
+        charges = frame['TotalCharges'].to_numpy()
+        fill_value = float(np.nanmedian(charges[::max(1, len(charges) // STREAM_MEDIAN_SAMPLE)]))
+
+    scaler = StandardScaler()
+    class_counts = np.zeros(2, dtype=np.int64)
+    for rows in chunks:
+        X, y = encode_chunk(frame, rows, config, fill_value)
+        scaler.partial_fit(X)
+        class_counts += np.bincount(y, minlength=2)
+
+    params = dict(config.model_params)
+    if params.get('class_weight') == 'balanced':
+        # Weights of the whole training set, not of each chunk
+        params['class_weight'] = {c: class_counts.sum() / (2 * class_counts[c]) for c in range(2)}
+    n_estimators = params.pop('n_estimators', 100)
+    model = RandomForestClassifier(random_state=config.random_state, n_jobs=config.n_jobs,
+                                   warm_start=True, n_estimators=0, **params)
+    for i, rows in enumerate(chunks):
+        # Spread the trees evenly so the forest has exactly n_estimators
+        total_trees = n_estimators * (i + 1) // len(chunks)
+        if total_trees == model.n_estimators:
+            continue
+        X, y = encode_chunk(frame, rows, config, fill_value)
+        if config.smote:
+            from imblearn.over_sampling import SMOTE
+            X, y = SMOTE(random_state=config.random_state).fit_resample(X, y)
+        model.set_params(n_estimators=total_trees)
+        model.fit(scaler.transform(X), y)
+    model.set_params(n_jobs=None, warm_start=False)
+
+    y_test, y_proba = [], []
+    for start in range(0, len(test_rows), config.chunk_rows):
+        X, y = encode_chunk(frame, test_rows[start:start + config.chunk_rows], config, fill_value)
+        y_test.append(y)
+        y_proba.append(model.predict_proba(scaler.transform(X))[:, 1])
+
+    encoders = {column: _label_encoder(SCHEMA[column]) for column in config.features
+                if isinstance(SCHEMA[column], list)}
+    dataset = Dataset(np.empty((0, len(config.features))), np.empty(0, dtype=np.int64),
+                      list(config.features), encoders)
+    return model, scaler, dataset, np.concatenate(y_test), np.concatenate(y_proba), int(class_counts.sum())
+
+
+def evaluate_model(model, scaler, X_test, y_test) -> dict:
+    y_proba = model.predict_proba(scaler.transform(X_test))[:, 1]
+    return prediction_metrics(y_test, y_proba)
+
+
+def prediction_metrics(y_test, y_proba) -> dict:
+    y_pred = (y_proba > 0.5).astype(np.int64)
+    return {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'roc_auc': float(roc_auc_score(y_test, y_proba)),
+        'confusion_matrix': confusion_matrix(y_test, y_pred).tolist(),
+        'report': classification_report(y_test, y_pred, target_names=['No Churn', 'Churn']),
+    }
+
+
+def save_model_artifacts(model, scaler, dataset: Dataset, config: TrainingConfig) -> dict:
+    """Write the pickles and the fused .fmodel artifact; returns {kind: path}"""
+    os.makedirs(config.output_dir, exist_ok=True)
+    suffix = config.model_suffix
+    paths = {
+        'model': os.path.join(config.output_dir, f'churn_model_{suffix}.pkl'),
+        'scaler': os.path.join(config.output_dir, f'scaler_{suffix}.pkl'),
+        'encoders': os.path.join(config.output_dir, f'label_encoders_{suffix}.pkl'),
+        'artifact': os.path.join(config.output_dir, f'churn_model_{suffix}.fmodel'),
+    }
+
+    encoders = {ENCODER_KEYS.get(column, column): encoder for column, encoder in dataset.encoders.items()}
+    for kind, obj in (('model', model), ('scaler', scaler), ('encoders', encoders)):
+        # Replace, never rewrite in place, so a running API never reads a half-written file
+        tmp_path = paths[kind] + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(obj, f)
+        os.replace(tmp_path, paths[kind])
+
+    # Scaler folded into the trees, encoders as lookups, mmap-able node arrays
+    fused = fuse_model(model, scaler, dataset.encoders, dataset.feature_names)
+    save_artifact(fused, paths['artifact'])
+    return paths
+
+
+def check_servable(config: TrainingConfig):
+    """Refuse to train a model into the API's models directory that /predict can't serve"""
+    if os.path.abspath(config.output_dir) != os.path.abspath(API_MODELS_DIR):
+        return
+    if sorted(config.features) != sorted(FEATURES):
+        raise ValueError(
+            f"The API serves exactly {FEATURES}; features {config.features} would replace its model "
+            f"in {API_MODELS_DIR}. Set output_dir (--output-dir) to train this feature set elsewhere."
+        )
+
+
+def run(config: TrainingConfig, use_cache: bool = True) -> dict:
+    """Train, evaluate and save one model; returns the evaluation metrics"""
+    check_servable(config)
+    print("=" * 60)
+    print("TRAINING CHURN MODEL")
+    print("=" * 60)
+    started = time.perf_counter()
+
+    if config.streaming:
+        step = time.perf_counter()
+        model, scaler, dataset, y_test, y_proba, n_train = fit_streaming(config)
+        print(f"\n1-3. Streamed {n_train} train / {len(y_test)} test records in chunks of "
+              f"{config.chunk_rows}; trained RandomForest {config.model_params} "
+              f"({len(model.estimators_)} trees, smote={config.smote}) in {time.perf_counter() - step:.2f}s")
+        metrics = prediction_metrics(y_test, y_proba)
+    else:
+        step = time.perf_counter()
+        dataset = load_dataset(config, use_cache=use_cache)
+        print(f"\n1. Loaded {len(dataset.y)} records, {len(dataset.feature_names)} features "
+              f"({time.perf_counter() - step:.2f}s)")
+        for column, encoder in dataset.encoders.items():
+            print(f"   {column} mapping: {dict(zip(encoder.classes_, range(len(encoder.classes_))))}")
+
+        X_train, X_test, y_train, y_test = split_dataset(dataset, config)
+        print(f"\n2. Split: {len(y_train)} train / {len(y_test)} test")
+
+        step = time.perf_counter()
+        model, scaler = fit_model(X_train, y_train, config)
+        print(f"\n3. Trained RandomForest {config.model_params} "
+              f"(smote={config.smote}, n_jobs={config.n_jobs}) in {time.perf_counter() - step:.2f}s")
+
+        metrics = evaluate_model(model, scaler, X_test, y_test)
+    print(f"\n4. Accuracy: {metrics['accuracy']:.4f}   ROC-AUC: {metrics['roc_auc']:.4f}")
+    print(metrics['report'])
+    cm = metrics['confusion_matrix']
+    print(f"   True Negatives: {cm[0][0]}, False Positives: {cm[0][1]}")
+    print(f"   False Negatives: {cm[1][0]}, True Positives: {cm[1][1]}")
+
+    importance = pd.DataFrame({
+        'feature': dataset.feature_names,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+    print("\n5. Feature Importance:")
+    print(importance.to_string(index=False))
+
+    paths = save_model_artifacts(model, scaler, dataset, config)
+    print(f"\n6. Saved artifacts to {config.output_dir}:")
+    for path in paths.values():
+        print(f"   ✓ {os.path.basename(path)}")
+
+    print("\n" + "=" * 60)
+    print(f"TRAINING COMPLETE in {time.perf_counter() - started:.2f}s")
+    print("=" * 60)
+    return metrics
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_config(args) -> TrainingConfig:
+    config = preset_config(args.preset)
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = TrainingConfig.from_dict(json.load(f), base=config)
+
+    overrides = {}
+    for name in ('data_path', 'output_dir', 'n_jobs', 'cache_dir', 'chunk_rows'):
+        if getattr(args, name) is not None:
+            overrides[name] = getattr(args, name)
+    # Paths on the command line are relative to the working directory
+    for name in PATH_FIELDS:
+        if name in overrides:
+            overrides[name] = os.path.abspath(overrides[name])
+    if args.smote is not None:
+        overrides['smote'] = args.smote
+    if args.streaming:
+        overrides['streaming'] = True
+    if args.set:
+        model_params = {}
+        for item in args.set:
+            key, _, value = item.partition('=')
+            model_params[key] = _parse_value(value)
+        overrides['model_params'] = model_params
+    return TrainingConfig.from_dict(overrides, base=config)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the churn model and write API artifacts")
+    parser.add_argument('--preset', default='balanced', choices=list(PRESETS))
+    parser.add_argument('--config', help="JSON file with TrainingConfig overrides")
+    parser.add_argument('--data', dest='data_path', help="input CSV (default: data.csv)")
+    parser.add_argument('--output-dir', help="artifact directory (default: backend models/)")
+    parser.add_argument('--cache-dir', help="dataset cache directory")
+    parser.add_argument('--n-jobs', type=int, help="forest fitting processes (default: -1, all cores)")
+    parser.add_argument('--smote', dest='smote', action='store_true', default=None)
+    parser.add_argument('--no-smote', dest='smote', action='store_false')
+    parser.add_argument('--streaming', action='store_true',
+                        help="fit chunk by chunk from the columnar cache, for data larger than memory")
+    parser.add_argument('--chunk-rows', type=int, help="streaming: training rows per chunk")
+    parser.add_argument('--set', action='append', metavar='PARAM=VALUE',
+                        help="RandomForest parameter override, e.g. --set n_estimators=300")
+    parser.add_argument('--no-cache', action='store_true', help="re-read and re-encode data.csv")
+    parser.add_argument('--print-config', action='store_true', help="print the resolved config and exit")
+    args = parser.parse_args(argv)
+
+    config = build_config(args)
+    if args.print_config:
+        print(json.dumps(asdict(config), indent=2))
+        return
+    run(config, use_cache=not args.no_cache)
+
+
+if __name__ == "__main__":
+    main()
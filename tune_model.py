@@ -0,0 +1,239 @@
+"""
+Hyperparameter search for the churn RandomForest.
+
+Candidates (forest parameters plus SMOTE on/off) are cross-validated on a
+process pool. The stratified folds are preprocessed once (SMOTE, scaling)
+and written as .npy files that every worker memory-maps, so fold data is
+never pickled to the workers.
+
+Usage:
+    python tune_model.py                                  # 30 random candidates, 5-fold CV
+    python tune_model.py --strategy halving --candidates 60
+    python tune_model.py --best-config best.json          # then: python training_pipeline.py --config best.json
+
+Reported per candidate: mean/std ROC-AUC, fit time, predict time per 1000
+rows and pickled model size.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from training_pipeline import PRESETS, TrainingConfig, fit_model, load_dataset, preset_config, split_dataset
+
+SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200, 300],
+    'max_depth': [6, 8, 10, 12, 16, None],
+    'min_samples_split': [2, 10, 20, 40],
+    'min_samples_leaf': [1, 5, 10, 20],
+    'max_features': ['sqrt', 0.6, None],
+    'class_weight': [None, 'balanced'],
+    'smote': [False, True],
+}
+# Candidates within this ROC-AUC of the best are considered equally accurate
+AUC_TOLERANCE = 0.005
+
+
+def sample_candidates(n: int, seed: int) -> list:
+    """Draw n distinct parameter sets from SEARCH_SPACE"""
+    rng = np.random.default_rng(seed)
+    candidates, seen = [], set()
+    attempts = 0
+    while len(candidates) < n and attempts < 100 * n:
+        attempts += 1
+        candidate = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        key = json.dumps(candidate, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+
+def prepare_folds(X, y, n_splits: int, random_state: int, cache_dir: str) -> str:
+    """
+    Write each fold's preprocessed train/validation matrices, with and
+    without SMOTE, as .npy files. Returns the fold directory; reused as
+    long as the training data and fold settings are unchanged.
+    """
+    digest = hashlib.sha256(X.tobytes() + y.tobytes() + f'{n_splits}:{random_state}'.encode()).hexdigest()[:16]
+    fold_dir = os.path.join(cache_dir, f'cv_{digest}')
+    if os.path.exists(os.path.join(fold_dir, 'done')):
+        return fold_dir
+
+    from imblearn.over_sampling import SMOTE
+    os.makedirs(fold_dir, exist_ok=True)
+    rng = np.random.default_rng(random_state)
+    folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for fold, (train_idx, val_idx) in enumerate(folds.split(X, y)):
+        for smote in (False, True):
+            X_train, y_train = X[train_idx], y[train_idx]
+            if smote:
+                X_train, y_train = SMOTE(random_state=random_state).fit_resample(X_train, y_train)
+            # Shuffle so that any prefix is a random subsample (successive halving)
+            order = rng.permutation(len(y_train))
+            scaler = StandardScaler().fit(X_train)
+            prefix = os.path.join(fold_dir, f'fold{fold}_smote{int(smote)}')
+            np.save(prefix + '_X_train.npy', scaler.transform(X_train[order]))
+            np.save(prefix + '_y_train.npy', y_train[order])
+            np.save(prefix + '_X_val.npy', scaler.transform(X[val_idx]))
+            np.save(prefix + '_y_val.npy', y[val_idx])
+    open(os.path.join(fold_dir, 'done'), 'w').close()
+    return fold_dir
+
+
+def evaluate_candidate(task: tuple) -> dict:
+    """Fit one candidate on one fold (runs in a worker process)"""
+    candidate_id, candidate, fold_dir, fold, fraction, random_state = task
+    params = {k: v for k, v in candidate.items() if k != 'smote'}
+    prefix = os.path.join(fold_dir, f"fold{fold}_smote{int(candidate['smote'])}")
+    X_train = np.load(prefix + '_X_train.npy', mmap_mode='r')
+    y_train = np.load(prefix + '_y_train.npy', mmap_mode='r')
+    X_val = np.load(prefix + '_X_val.npy', mmap_mode='r')
+    y_val = np.load(prefix + '_y_val.npy', mmap_mode='r')
+
+    n_rows = max(1, int(len(y_train) * fraction))
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+    start = time.perf_counter()
+    model.fit(X_train[:n_rows], y_train[:n_rows])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_val)[:, 1]
+    predict_time = time.perf_counter() - start
+
+    return {
+        'candidate': candidate_id,
+        'fold': fold,
+        'roc_auc': roc_auc_score(y_val, proba),
+        'fit_time': fit_time,
+        'predict_ms_per_1k': 1000.0 * predict_time / len(y_val) * 1000,
+        'model_kb': len(pickle.dumps(model)) / 1024,
+    }
+
+
+def run_round(pool, candidates: dict, fold_dir: str, n_splits: int, fraction: float, random_state: int) -> pd.DataFrame:
+    """Cross-validate every candidate; returns one row per candidate"""
+    tasks = [(cid, candidate, fold_dir, fold, fraction, random_state)
+             for cid, candidate in candidates.items() for fold in range(n_splits)]
+    results = pd.DataFrame(list(pool.map(evaluate_candidate, tasks)))
+    summary = results.groupby('candidate').agg(
+        roc_auc=('roc_auc', 'mean'),
+        roc_auc_std=('roc_auc', 'std'),
+        fit_time=('fit_time', 'mean'),
+        predict_ms_per_1k=('predict_ms_per_1k', 'mean'),
+        model_kb=('model_kb', 'mean'),
+    )
+    return summary.sort_values('roc_auc', ascending=False)
+
+
+def search(X, y, candidates: list, strategy: str = 'random', n_splits: int = 5, eta: int = 3,
+           n_workers: int = None, random_state: int = 42, cache_dir: str = None) -> pd.DataFrame:
+    """
+    Cross-validate candidates; returns one row per candidate and round,
+    with the fraction of each training fold it was fitted on.
+
+    'random' evaluates every candidate on full folds. 'halving' starts all
+    candidates on a 1/eta^k subsample of each training fold and keeps the
+    best 1/eta each round until the survivors run on full folds.
+    """
+    fold_dir = prepare_folds(X, y, n_splits, random_state, cache_dir)
+    remaining = dict(enumerate(candidates))
+    rounds = 0
+    if strategy == 'halving':
+        while len(remaining) // eta ** rounds > 1:
+            rounds += 1
+
+    history = []
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        for r in range(rounds, -1, -1):
+            fraction = 1.0 / eta ** r
+            summary = run_round(pool, remaining, fold_dir, n_splits, fraction, random_state)
+            print(f"   round with {len(remaining)} candidates on {fraction:.0%} of each fold: "
+                  f"best ROC-AUC {summary['roc_auc'].iloc[0]:.4f}")
+            history.append(summary.assign(fraction=fraction))
+            if r:
+                keep = summary.index[:max(1, len(remaining) // eta)]
+                remaining = {cid: remaining[cid] for cid in keep}
+
+    params = pd.DataFrame.from_dict(dict(enumerate(candidates)), orient='index', dtype=object)
+    return pd.concat(history[::-1]).join(params)
+
+
+def pick_best(summary: pd.DataFrame) -> pd.Series:
+    """Fastest-predicting full-data candidate whose ROC-AUC is within AUC_TOLERANCE of the best"""
+    summary = summary[summary['fraction'] == 1.0]
+    contenders = summary[summary['roc_auc'] >= summary['roc_auc'].max() - AUC_TOLERANCE]
+    return contenders.sort_values(['predict_ms_per_1k', 'model_kb']).iloc[0]
+
+
+def check_best_config(path: str, base: TrainingConfig, X, y, n_rows: int = 500):
+    """Fail now, not at training time, if the written config can't be loaded and fitted"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = TrainingConfig.from_dict(json.load(f), base=base)
+    fit_model(X[:n_rows], y[:n_rows], replace(config, n_jobs=1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the churn forest")
+    parser.add_argument('--preset', default='balanced', choices=list(PRESETS),
+                        help="base config supplying data path, features and cleaning")
+    parser.add_argument('--strategy', default='random', choices=['random', 'halving'])
+    parser.add_argument('--candidates', type=int, default=30)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--eta', type=int, default=3, help="halving: keep 1/eta per round")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="candidate sampling seed")
+    parser.add_argument('--report', help="write the full results table as CSV")
+    parser.add_argument('--best-config', help="write the chosen candidate as a training_pipeline.py --config JSON")
+    args = parser.parse_args(argv)
+
+    config = preset_config(args.preset)
+    dataset = load_dataset(config)
+    # Tune on the training split only; the test split stays unseen
+    X_train, _, y_train, _ = split_dataset(dataset, config)
+
+    candidates = sample_candidates(args.candidates, args.seed)
+    print("=" * 100)
+    print(f"HYPERPARAMETER SEARCH: {len(candidates)} candidates, {args.strategy}, {args.folds}-fold CV")
+    print("=" * 100)
+    start = time.perf_counter()
+    summary = search(X_train, y_train, candidates, strategy=args.strategy, n_splits=args.folds,
+                     eta=args.eta, n_workers=args.workers, random_state=config.random_state,
+                     cache_dir=config.cache_dir)
+
+    columns = ['fraction', 'roc_auc', 'roc_auc_std', 'fit_time', 'predict_ms_per_1k', 'model_kb'] + list(SEARCH_SPACE)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summary[columns].head(15).round(4).to_string())
+    print(f"\nSearch finished in {time.perf_counter() - start:.1f}s")
+
+    best = pick_best(summary)
+    # From the candidate dict, not the joined row, where ints sharing a column with None became floats
+    chosen = candidates[best.name]
+    best_params = {name: value for name, value in chosen.items() if name != 'smote'}
+    print(f"\nChosen (fastest within {AUC_TOLERANCE} ROC-AUC of the best): "
+          f"ROC-AUC {best['roc_auc']:.4f}, {best['predict_ms_per_1k']:.1f} ms/1k rows, "
+          f"{best['model_kb']:.0f} KB, smote={chosen['smote']}, {best_params}")
+
+    if args.report:
+        summary[columns].to_csv(args.report)
+        print(f"Report written to {args.report}")
+    if args.best_config:
+        with open(args.best_config, 'w', encoding='utf-8') as f:
+            json.dump({'smote': chosen['smote'], 'model_params': best_params}, f, indent=2)
+        check_best_config(args.best_config, config, X_train, y_train)
+        print(f"Best config written to {args.best_config}")
+
+
+if __name__ == "__main__":
+    main()